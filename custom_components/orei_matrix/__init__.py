@@ -1,14 +1,25 @@
 import logging
-from datetime import timedelta
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import CONF_INPUTS, CONF_OUTPUTS, CONF_SOURCES, CONF_ZONES, DOMAIN
-from .coordinator import OreiMatrixClient
+from .const import (
+    CONF_COALESCE_WINDOW,
+    CONF_INPUTS,
+    CONF_OUTPUTS,
+    CONF_SKIP_NOOP_WRITES,
+    CONF_SOURCES,
+    CONF_ZONES,
+    DEFAULT_COALESCE_WINDOW,
+    DOMAIN,
+)
+from .coordinator import (
+    OreiMatrixClient,
+    OreiMatrixCoordinator,
+    OreiMatrixLinkCoordinator,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,52 +28,47 @@ _LOGGER.warning("OREI MATRIX DEV BUILD LOADED")
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
-    client = OreiMatrixClient(entry.data["host"], entry.data.get("port", 23))
-    type_str = await client.get_type()
+    config = entry.options if entry.options else entry.data
 
-    async def async_update_data():
-        try:
-            power = await client.get_power()
-            outputs = await client.get_output_sources()
-            input_links = await client.get_in_links()
-            return {
-                "power": power,
-                "type": type_str,
-                "outputs": outputs,
-                "input_links": input_links,
-            }
-        except Exception as err:
-            _LOGGER.error("Update failed: %s", err)
-            raise UpdateFailed(err) from err
+    # Get input/output counts from config
+    outputs = config.get(CONF_OUTPUTS, config.get(CONF_ZONES, []))
+    inputs = config.get(CONF_INPUTS, config.get(CONF_SOURCES, []))
+    output_count = len(outputs)
+    input_count = len(inputs)
 
-    coordinator = DataUpdateCoordinator(
+    client = OreiMatrixClient(
+        entry.data["host"],
+        entry.data.get("port", 23),
+        input_count=input_count,
+        output_count=output_count,
+        coalesce_window=config.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW),
+    )
+    type_str = await client.get_type()
+
+    # Link states change far more often than routing and power, so they are
+    # polled by their own coordinator
+    link_coordinator = OreiMatrixLinkCoordinator(hass, client)
+    coordinator = OreiMatrixCoordinator(
         hass,
-        _LOGGER,
-        name="orei_matrix",
-        update_method=async_update_data,
-        update_interval=timedelta(seconds=10),
+        client,
+        type_str,
+        link_coordinator,
+        inputs,
+        skip_noop_writes=config.get(CONF_SKIP_NOOP_WRITES, False),
     )
 
     await coordinator.async_config_entry_first_refresh()
+    if link_coordinator.data is None:
+        await link_coordinator.async_config_entry_first_refresh()
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
         "client": client,
         "coordinator": coordinator,
-        "config": entry.options if entry.options else entry.data,
+        "link_coordinator": link_coordinator,
+        "config": config,
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    data = hass.data[DOMAIN][entry.entry_id]
-    client = data["client"]
-    coordinator = data["coordinator"]
-    config = data["config"]
-
-    # Get input/output counts from config
-    outputs = config.get(CONF_OUTPUTS, config.get(CONF_ZONES, []))
-    inputs = config.get(CONF_INPUTS, config.get(CONF_SOURCES, []))
-    output_count = len(outputs)
-    input_count = len(inputs)
-
     # Service: Refresh
     async def handle_refresh_service(call: ServiceCall):
         """Handle manual refresh of all states."""
@@ -78,7 +84,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
         await client.set_cec_out(output, "on")
         await client.set_output_active(output)
-        await coordinator.async_request_refresh()
         _LOGGER.info("Powered on output %d and set as active source", output)
 
     # Service: Power Off Output
@@ -90,7 +95,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             return
 
         await client.set_cec_out(output, "off")
-        await coordinator.async_request_refresh()
         _LOGGER.info("Powered off output %d", output)
 
     # Service: Set Output Active
@@ -102,7 +106,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             return
 
         await client.set_output_active(output)
-        await coordinator.async_request_refresh()
         _LOGGER.info("Set output %d as active source", output)
 
     # Service: Power On Input
@@ -114,7 +117,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             return
 
         await client.set_cec_in(input_id, "on")
-        await coordinator.async_request_refresh()
+        await coordinator.async_request_read_back(inputs=[input_id])
         _LOGGER.info("Powered on input %d", input_id)
 
     # Service: Power Off Input
@@ -126,7 +129,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             return
 
         await client.set_cec_in(input_id, "off")
-        await coordinator.async_request_refresh()
+        await coordinator.async_request_read_back(inputs=[input_id])
         _LOGGER.info("Powered off input %d", input_id)
 
     # Service: Route Input to Output
@@ -142,8 +145,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             _LOGGER.error("Invalid output %d (must be 1-%d)", output, output_count)
             return
 
-        await client.set_output_source(input_id, output)
-        await coordinator.async_request_refresh()
+        await coordinator.async_set_output_source(input_id, output)
         _LOGGER.info("Routed input %d to output %d", input_id, output)
 
     # Service: Route Input to Multiple Outputs
@@ -156,13 +158,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             _LOGGER.error("Invalid input %d (must be 1-%d)", input_id, input_count)
             return
 
+        valid_outputs = []
         for output in output_list:
             if not 1 <= output <= output_count:
                 _LOGGER.error("Invalid output %d (must be 1-%d)", output, output_count)
                 continue
-            await client.set_output_source(input_id, output)
+            valid_outputs.append(output)
 
-        await coordinator.async_request_refresh()
+        await coordinator.async_set_output_sources(input_id, valid_outputs)
         _LOGGER.info("Routed input %d to outputs %s", input_id, output_list)
 
     # Service: Power On All Outputs
@@ -172,7 +175,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             await client.set_cec_out(output, "on")
             await client.set_output_active(output)
 
-        await coordinator.async_request_refresh()
         _LOGGER.info("Powered on all %d outputs", output_count)
 
     # Service: Power Off All Outputs
@@ -181,7 +183,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         for output in range(1, output_count + 1):
             await client.set_cec_out(output, "off")
 
-        await coordinator.async_request_refresh()
         _LOGGER.info("Powered off all %d outputs", output_count)
 
     # Register all services with schemas
@@ -267,6 +268,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unloaded:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        await data["coordinator"].async_shutdown()
+        await data["link_coordinator"].async_shutdown()
+        await data["client"].close()
     return unloaded
     return unloaded
@@ -1,9 +1,9 @@
 import logging
 
 from homeassistant.components.button import ButtonEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import CONF_OUTPUTS, CONF_ZONES, DOMAIN
+from .entity import OreiMatrixEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,7 +36,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
     async_add_entities(entities)
 
 
-class OreiMatrixOutputPowerButton(CoordinatorEntity, ButtonEntity):
+class OreiMatrixOutputPowerButton(OreiMatrixEntity, ButtonEntity):
     """Button to send explicit CEC power commands to an output."""
 
     def __init__(
@@ -64,18 +64,19 @@ class OreiMatrixOutputPowerButton(CoordinatorEntity, ButtonEntity):
     @property
     def available(self):
         """Entity availability based on matrix power."""
-        return bool(self.coordinator.data.get("power"))
+        return self.coordinator.data.power
 
     @property
     def device_info(self):
         """Device info for grouping under the matrix."""
-        model = self.coordinator.data.get("type", "Unknown")
+        model = self.coordinator.data.type or "Unknown"
         name = f"Orei {model}" if model != "Unknown" else "Orei HDMI Matrix"
         return {
             "identifiers": {(DOMAIN, self._entry_id)},
             "name": name,
             "manufacturer": "Orei",
             "model": model,
+            "sw_version": self.coordinator.client.firmware_version,
             "configuration_url": f"http://{self._host}",
         }
 
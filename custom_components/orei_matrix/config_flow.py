@@ -6,12 +6,15 @@ from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.selector import selector
 
 from .const import (
+    CONF_COALESCE_WINDOW,
     CONF_HOST,
     CONF_INPUTS,
     CONF_OUTPUTS,
     CONF_PORT,
+    CONF_SKIP_NOOP_WRITES,
     CONF_SOURCES,
     CONF_ZONES,
+    DEFAULT_COALESCE_WINDOW,
     DOMAIN,
 )
 from .coordinator import OreiMatrixClient
@@ -60,7 +63,7 @@ async def validate_input(hass, data):
         device_type = await client.get_type()
         status = await client.get_status()
     finally:
-        await client.disconnect()
+        await client.close()
 
     if not device_type or len(device_type) < 3:
         raise InvalidDeviceResponse(
@@ -236,6 +239,16 @@ class OreiMatrixOptionsFlow(config_entries.OptionsFlow):
                 vol.Optional(CONF_OUTPUTS, default=outputs): selector(
                     {"text": {"multiple": True}}
                 ),
+                vol.Optional(
+                    CONF_COALESCE_WINDOW,
+                    default=current_data.get(
+                        CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=2)),
+                vol.Optional(
+                    CONF_SKIP_NOOP_WRITES,
+                    default=current_data.get(CONF_SKIP_NOOP_WRITES, False),
+                ): bool,
             }
         )
 
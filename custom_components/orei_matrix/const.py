@@ -4,6 +4,8 @@ CONF_HOST = "host"
 CONF_PORT = "port"
 CONF_INPUTS = "inputs"
 CONF_OUTPUTS = "outputs"
+CONF_COALESCE_WINDOW = "coalesce_window"
+CONF_SKIP_NOOP_WRITES = "skip_noop_writes"
 
 # Legacy support for existing configs
 CONF_SOURCES = "sources"
@@ -11,3 +13,12 @@ CONF_ZONES = "zones"
 
 DEFAULT_PORT = 23
 DEFAULT_NAME = "Orei HDMI Matrix"
+
+# Seconds to hold a routing change so rapid changes to one output collapse
+DEFAULT_COALESCE_WINDOW = 0.1
+
+# Dispatcher signals the coordinator sends for one config entry when matrix
+# power, one output's routing or one input's link state or routing changes
+SIGNAL_POWER_UPDATED = f"{DOMAIN}_{{}}_power"
+SIGNAL_OUTPUT_UPDATED = f"{DOMAIN}_{{}}_output_{{}}"
+SIGNAL_INPUT_UPDATED = f"{DOMAIN}_{{}}_input_{{}}"
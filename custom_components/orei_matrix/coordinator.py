@@ -1,124 +1,693 @@
 import asyncio
 import logging
+import re
+from collections.abc import Callable, Iterable, Mapping
+from datetime import timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import (
+    DEFAULT_COALESCE_WINDOW,
+    SIGNAL_INPUT_UPDATED,
+    SIGNAL_OUTPUT_UPDATED,
+    SIGNAL_POWER_UPDATED,
+)
+from .models import LinkSnapshot, MatrixSnapshot, RoutingSnapshot, RoutingView
+from .parser import (
+    InputLinkEvent,
+    OutputLinkEvent,
+    PowerEvent,
+    RouteEvent,
+    parse_banner,
+    parse_events,
+)
+from .transport import PROMPT, MatrixProtocol
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds to wait for the prompt ending the banner printed on connect
+BANNER_TIMEOUT = 1.0
+
+# Fallback for firmware that does not echo commands or print a prompt
+RESPONSE_IDLE_TIMEOUT = 0.3
+
+# Queued jobs run lowest priority first: user writes before polling reads
+PRIORITY_USER = 0
+PRIORITY_POLL = 1
+
+# A single-port read costs an echo, a line and a prompt, a bulk read one line
+# per port, so past this many lines per port the bulk read is cheaper
+PORT_READ_COST = 3
+
+# Polls in a row whose "r status!" reply has no routing before it is no
+# longer used for polling
+STATUS_MISS_LIMIT = 3
+
+# Seconds to wait after a change before reading back the touched ports
+READ_BACK_DELAY = 1.0
+
+# Input link states change whenever a source wakes, so they poll on their own:
+# often while the matrix is in use, less once it idles, and only to reconcile
+# once the matrix has pushed a change
+LINK_POLL_INTERVAL = timedelta(seconds=5)
+LINK_IDLE_POLL_INTERVAL = timedelta(seconds=15)
+
+# Polling is fast right after activity and backs off step by step to the idle
+# interval, or to the reconcile interval once the matrix has pushed a change
+FAST_POLL_INTERVAL = timedelta(seconds=2)
+IDLE_POLL_INTERVAL = timedelta(seconds=30)
+RECONCILE_INTERVAL = timedelta(seconds=60)
+POWER_OFF_POLL_INTERVAL = timedelta(seconds=60)
+
+# Polls in a row that find changes the matrix did not push before polling
+# goes back from the reconcile interval to the idle one
+MISSED_PUSH_LIMIT = 3
+
+# Coalescing keys for writes that replace each other's effect
+POWER_KEY = "power"
+
+
+def _routing_key(output_id: int) -> str:
+    """Return the coalescing key for routing writes to an output."""
+    return f"av out {output_id}"
+
+
+def _is_write(cmd: str) -> bool:
+    """Return True for a command that sets state rather than reading it."""
+    return cmd.startswith("s ")
+
+
+# Writes to an output: routing, and CEC commands to the display behind it
+_OUTPUT_WRITE = re.compile(r"s (?:in \d+ av|cec \w+) out (\d+)[ !]")
+
+
+def _write_keys(cmds: list[str]) -> frozenset[str]:
+    """Return the coalescing keys of the state that commands write."""
+    keys = set()
+    for cmd in cmds:
+        if match := _OUTPUT_WRITE.match(cmd):
+            keys.add(_routing_key(int(match[1])))
+        elif cmd.startswith("s power "):
+            keys.add(POWER_KEY)
+    return frozenset(keys)
+
+
+def _read_only(value):
+    """Return a dict, and the dicts nested in it, as read-only mappings."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _read_only(item) for key, item in value.items()})
+    return value
+
+
+@lru_cache(maxsize=512)
+def _encode_command(cmd: str) -> tuple[bytes, str]:
+    """Return the bytes to send for a command and the echo to look for."""
+    # Some firmware echoes the command without the trailing "!"
+    return cmd.encode("ascii") + b"\r\n", cmd.rstrip("!")
+
+
+class _Job:
+    """A batch of commands waiting for its turn on the connection."""
+
+    __slots__ = ("cmds", "futures", "key", "keys", "not_before", "priority", "seq")
+
+    def __init__(
+        self,
+        cmds: list[str],
+        priority: int,
+        seq: int,
+        key: str | None = None,
+        not_before: float = 0.0,
+    ):
+        self.cmds = cmds
+        self.priority = priority
+        self.seq = seq
+        # Queued jobs with the same key collapse into the most recent one
+        self.key = key
+        # Keys of all the state the commands write, keyed or not
+        self.keys = _write_keys(cmds) | ({key} if key is not None else set())
+        # Loop time before which the job is held back to allow collapsing
+        self.not_before = not_before
+        self.futures: list[asyncio.Future] = []
+
+
+class _Reply:
+    """Lines received for commands written together, split on their echoes."""
+
+    __slots__ = (
+        "echoes",
+        "expected_lines",
+        "future",
+        "idle_timer",
+        "lines",
+        "prompted",
+        "unechoed",
+    )
+
+    def __init__(
+        self,
+        cmds: list[str],
+        expected_lines: int | None,
+        future: asyncio.Future,
+    ):
+        self.echoes = [_encode_command(cmd)[1] for cmd in cmds]
+        # Lines after the last command's echo that complete its reply
+        self.expected_lines = expected_lines
+        self.future = future
+        self.idle_timer: asyncio.TimerHandle | None = None
+        # Lines for each command echoed so far, and lines before the first
+        self.lines: list[list[str]] = []
+        self.unechoed: list[str] = []
+        self.prompted = False
+
+    @property
+    def echoed(self) -> bool:
+        """Return True once every command has been echoed."""
+        return len(self.lines) == len(self.echoes)
+
 
 class OreiMatrixClient:
     """Async client for controlling Orei HDMI Matrix via Telnet."""
 
-    def __init__(self, host, port=23):
+    def __init__(
+        self,
+        host,
+        port=23,
+        input_count=None,
+        output_count=None,
+        coalesce_window=DEFAULT_COALESCE_WINDOW,
+    ):
         self._host = host
         self._port = port
-        self._reader = None
-        self._writer = None
-        self._lock = asyncio.Lock()
+        # Routing writes to one output within this many seconds collapse
+        self._coalesce_window = coalesce_window
+        # Known port counts let bulk reads finish on the last expected line
+        self._input_count = input_count
+        self._output_count = output_count
+        self._protocol: MatrixProtocol | None = None
+        self._transport: asyncio.Transport | None = None
+        # Set while connect() reads the banner, up to the first prompt
+        self._handshake: asyncio.Future | None = None
+        self._banner: list[str] = []
+        # What the banner said, once connected
+        self.firmware_version: str | None = None
+        self.model: str | None = None
+        # Lines received while a command waits go to its reply, anything else
+        # is parsed as an unsolicited notification
+        self._reply: _Reply | None = None
+        self._last_received = 0.0
+        # Set while the tail of a reply that finished early may still arrive
+        self._discard_until_prompt = False
+        self._listeners: list[Callable[[dict], None]] = []
+        self._queue: list[_Job] = []
+        self._queue_event = asyncio.Event()
+        self._seq = 0
+        self._worker: asyncio.Task | None = None
+        self._current: _Job | None = None
+        # Cleared if the firmware turns out not to echo pipelined commands
+        self._pipelining = True
+        # Cleared if "r status!" turns out not to report routing
+        self._status_polling = True
+        self._status_misses = 0
+        # Most polls get the same reply as last time, so each command's last
+        # lines are kept, and the parsed result of those lines
+        self._responses: dict[str, list[str]] = {}
+        self._parsed: dict[str, tuple[object, Any]] = {}
 
     # -----------------------
     # Connection management
     # -----------------------
 
     async def connect(self):
-        """Establish a TCP connection to the matrix."""
-        self._reader, self._writer = await asyncio.wait_for(
-            asyncio.open_connection(self._host, self._port),
-            timeout=5.0,
+        """Establish a TCP connection to the matrix and read its banner.
+
+        The banner runs up to the first prompt, so it is read here once and
+        never ends up in a command's reply.
+        """
+        loop = asyncio.get_running_loop()
+        protocol = MatrixProtocol(
+            self._data_received, lambda exc: self._connection_lost(protocol, exc)
         )
-        _LOGGER.debug("Connected to Orei Matrix at %s:%s", self._host, self._port)
+        self._protocol = protocol
+        self._handshake = loop.create_future()
+        self._banner = []
+        try:
+            self._transport, _ = await asyncio.wait_for(
+                loop.create_connection(lambda: protocol, self._host, self._port),
+                timeout=5.0,
+            )
+            _LOGGER.debug("Connected to Orei Matrix at %s:%s", self._host, self._port)
+            try:
+                await asyncio.wait_for(self._handshake, BANNER_TIMEOUT)
+            except TimeoutError:
+                _LOGGER.debug("No prompt after the banner, carrying on without it")
+        finally:
+            self._handshake = None
+
+        banner = parse_banner(self._banner)
+        self.firmware_version = banner.firmware_version or self.firmware_version
+        self.model = banner.model or self.model
+        _LOGGER.debug("Matrix banner: %s", banner)
 
     async def disconnect(self):
         """Close the connection."""
-        if not self._writer:
+        if not self._transport:
             return
 
-        self._writer.close()
-        try:
-            await self._writer.wait_closed()
-        except Exception:
-            pass  # Best effort cleanup
-        finally:
-            self._reader = None
-            self._writer = None
-            _LOGGER.debug("Disconnected from Orei Matrix")
+        self._transport.close()
+        self._transport = None
+        self._protocol = None
+        _LOGGER.debug("Disconnected from Orei Matrix")
 
     async def _ensure_connected(self):
         """Reconnect if needed."""
-        if not self._writer or self._writer.is_closing():
+        if not self._transport or self._transport.is_closing():
             await self.connect()
 
+    def add_notification_listener(
+        self, listener: Callable[[dict], None]
+    ) -> Callable[[], None]:
+        """Call listener with state changes the matrix reports on its own.
+
+        The listener gets a partial state dict with any of the "power",
+        "outputs" and "input_links" keys. Returns a function that removes it;
+        calling that function again is a no-op.
+        """
+        self._listeners.append(listener)
+
+        def remove_listener():
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove_listener
+
+    def _data_received(self, items: list[str]):
+        """Hand received lines to the waiting command or parse them as news."""
+        self._last_received = asyncio.get_running_loop().time()
+        unsolicited = []
+        for item in items:
+            handshake = self._handshake
+            if handshake is not None and not handshake.done():
+                if item == PROMPT:
+                    handshake.set_result(None)
+                else:
+                    self._banner.append(item)
+                continue
+            reply = self._reply
+            if reply is not None and not reply.future.done():
+                self._reply_received(reply, item)
+            elif item == PROMPT:
+                self._discard_until_prompt = False
+            elif not self._discard_until_prompt:
+                unsolicited.append(item)
+        self._notify(unsolicited)
+
+    def _reply_received(self, reply: _Reply, item: str):
+        """Add a line or prompt to the reply of the commands being sent."""
+        if item == PROMPT:
+            # Prompts between pipelined commands do not end the reply
+            if reply.echoed:
+                reply.prompted = True
+                self._finish_reply(reply)
+            return
+
+        index = len(reply.lines)
+        if index < len(reply.echoes) and item.rstrip("!") == reply.echoes[index]:
+            reply.lines.append([])
+            return
+        if not index:
+            reply.unechoed.append(item)
+            return
+
+        reply.lines[-1].append(item)
+        if (
+            reply.echoed
+            and reply.expected_lines
+            and len(reply.lines[-1]) >= reply.expected_lines
+        ):
+            self._finish_reply(reply)
+
+    def _finish_reply(self, reply: _Reply):
+        """Wake the command waiting for a reply."""
+        if reply.future.done():
+            return
+        # Without a prompt, the tail of the reply may still be on its way
+        self._discard_until_prompt = not reply.prompted
+        reply.future.set_result(None)
+
+    def _check_idle(self, reply: _Reply):
+        """Finish a reply once nothing has been received for a while."""
+        if reply.future.done():
+            return
+        loop = asyncio.get_running_loop()
+        # The timer is only moved on here rather than on every receive
+        remaining = self._last_received + RESPONSE_IDLE_TIMEOUT - loop.time()
+        if remaining > 0:
+            reply.idle_timer = loop.call_later(remaining, self._check_idle, reply)
+            return
+        _LOGGER.debug("No prompt for commands %s, used idle timeout", reply.echoes)
+        self._finish_reply(reply)
+
+    def _connection_lost(self, protocol: MatrixProtocol, exc: Exception | None):
+        """Fail whatever waits on the connection when it closes."""
+        if protocol is not self._protocol:
+            return  # A connection closed or replaced since
+        _LOGGER.debug("Connection to matrix lost: %s", exc)
+        for future in (
+            self._handshake,
+            self._reply.future if self._reply is not None else None,
+        ):
+            if future is not None and not future.done():
+                future.set_exception(
+                    ConnectionError(f"Connection to matrix lost: {exc}")
+                )
+
+    def _notify(self, lines: list[str]):
+        """Pass the changes in lines the matrix sent on its own to listeners."""
+        changes = self._parse_notification(lines) if lines else None
+        if not changes:
+            return
+        _LOGGER.debug("Matrix reported changes: %s", changes)
+        for listener in list(self._listeners):
+            try:
+                listener(changes)
+            except Exception:
+                _LOGGER.exception("Error handling matrix notification")
+
+    async def close(self):
+        """Stop the command worker and close the connection."""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        for job in self._queue:
+            for future in job.futures:
+                future.cancel()
+        self._queue.clear()
+        await self.disconnect()
+
     # -----------------------
     # Core command handling
     # -----------------------
 
     async def _send_command_multiple(self, cmd: str) -> list[str]:
-        async with self._lock:
-            await self._ensure_connected()
-            return await self._send_and_parse(cmd)
+        return (await self.batch([cmd]))[0]
+
+    async def batch(self, cmds: list[str]) -> list[list[str]]:
+        """Send several commands in one write and return each one's lines.
+
+        The combined reply is split back into per-command responses on the
+        echoed commands. Firmware that does not echo falls back to sending
+        the commands one at a time.
+        """
+        if not cmds:
+            return []
+
+        # Anything that sets state was asked for by a user and goes first
+        is_write = any(map(_is_write, cmds))
+        return await self._submit(cmds, PRIORITY_USER if is_write else PRIORITY_POLL)
+
+    async def _submit(
+        self,
+        cmds: list[str],
+        priority: int,
+        key: str | None = None,
+        delay: float = 0.0,
+    ) -> list[list[str]]:
+        """Queue commands for the worker and wait for their responses.
+
+        A job with a key replaces the commands of a still-queued job with the
+        same key, and delay holds it back so that later ones can do so.
+        """
+        _, future = self._enqueue(cmds, priority, key, delay)
+        return await future
+
+    async def _submit_write(
+        self, cmds: list[str], key: str, delay: float = 0.0
+    ) -> bool:
+        """Queue a coalescing write and return True if its commands were sent.
+
+        False means a later write with the same key replaced these commands
+        before they went out, and that write's caller sees its effect.
+        """
+        job, future = self._enqueue(cmds, PRIORITY_USER, key, delay)
+        await future
+        return job.cmds == cmds
+
+    def _enqueue(
+        self,
+        cmds: list[str],
+        priority: int,
+        key: str | None = None,
+        delay: float = 0.0,
+    ) -> tuple[_Job, asyncio.Future]:
+        """Add commands to the queue and return their job and result future."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+
+        if key is not None:
+            job = next((queued for queued in self._queue if queued.key == key), None)
+            if job is not None:
+                _LOGGER.debug("Coalescing %s into queued %s", cmds, job.cmds)
+                job.cmds = cmds
+        elif priority == PRIORITY_POLL:
+            job = self._find_shared_job(cmds)
+        else:
+            job = None
+
+        if job is None:
+            self._seq += 1
+            job = _Job(cmds, priority, self._seq, key, loop.time() + delay)
+            self._release_held(job)
+            self._queue.append(job)
+            self._queue_event.set()
+        job.futures.append(future)
+
+        if not self._worker or self._worker.done():
+            self._worker = asyncio.create_task(self._run_queue())
+
+        return job, future
+
+    def _release_held(self, job: _Job):
+        """Let held-back writes to the state job writes go out before it.
+
+        Otherwise a later write to the same output, such as a batch route,
+        would overtake a route still held back for coalescing.
+        """
+        if not job.keys:
+            return
+        now = asyncio.get_running_loop().time()
+        for queued in self._queue:
+            if queued.not_before > now and queued.keys & job.keys:
+                queued.not_before = now
+
+    def has_pending(self, key: str) -> bool:
+        """Return True if a write to the state with this key is queued or sent."""
+        if self._current is not None and key in self._current.keys:
+            return True
+        return any(key in queued.keys for queued in self._queue)
+
+    def _find_shared_job(self, cmds: list[str]) -> _Job | None:
+        """Return a job whose response an identical read can share, if any."""
+        # A poll still waiting in the queue would be stale by the time a newer
+        # identical one ran, so both callers share a single execution
+        for queued in self._queue:
+            if queued.priority == PRIORITY_POLL and queued.cmds == cmds:
+                return queued
+
+        # The same read already on the wire answers this caller too, unless a
+        # write is waiting that the caller may expect to see reflected
+        current = self._current
+        if (
+            current is not None
+            and current.priority == PRIORITY_POLL
+            and current.cmds == cmds
+            and not any(queued.priority == PRIORITY_USER for queued in self._queue)
+        ):
+            return current
+
+        return None
+
+    async def _run_queue(self):
+        """Run queued jobs one at a time, highest priority first."""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            ready = [queued for queued in self._queue if queued.not_before <= now]
+            if not ready:
+                # Sleep until something is queued or a held-back job is due
+                self._queue_event.clear()
+                timeout = None
+                if self._queue:
+                    timeout = min(queued.not_before for queued in self._queue) - now
+                try:
+                    await asyncio.wait_for(self._queue_event.wait(), timeout)
+                except TimeoutError:
+                    pass
+                continue
+
+            job = min(ready, key=lambda queued: (queued.priority, queued.seq))
+            self._queue.remove(job)
+
+            if all(future.done() for future in job.futures):
+                continue  # Every caller gave up while queued
+
+            # Callers may still join the job while it runs, so the futures are
+            # only collected once it has finished
+            self._current = job
+            try:
+                await self._ensure_connected()
+                results = await self._execute(job.cmds)
+            except asyncio.CancelledError:
+                for future in job.futures:
+                    future.cancel()
+                raise
+            except Exception as err:  # Handed to every waiting caller
+                for future in job.futures:
+                    if not future.done():
+                        future.set_exception(err)
+                continue
+            finally:
+                self._current = None
+
+            for future in job.futures:
+                if not future.done():
+                    future.set_result(results)
+
+    async def _execute(self, cmds: list[str]) -> list[list[str]]:
+        """Send a job's commands on the connection and split the responses."""
+        if len(cmds) == 1 or not self._pipelining:
+            return [await self._send_and_parse(cmd) for cmd in cmds]
+
+        try:
+            reply = await self._send_and_read(cmds)
+        except Exception as e:
+            _LOGGER.warning("Telnet batch failed (%s), reconnecting...", e)
+            await self.disconnect()
+            raise
+
+        if not reply.lines and not reply.unechoed:
+            _LOGGER.warning("No response received for commands: %s", cmds)
+            return [[] for _ in cmds]
+
+        if not reply.echoed:
+            self._pipelining = False
+            if any(map(_is_write, cmds)):
+                # The matrix has already run the writes, and sending them
+                # again would repeat toggles such as CEC power
+                _LOGGER.warning(
+                    "Matrix did not echo batched commands, sending later "
+                    "batches one at a time"
+                )
+                return reply.lines + [[] for _ in cmds[len(reply.lines) :]]
+            _LOGGER.warning(
+                "Matrix did not echo batched commands, sending one at a time"
+            )
+            return [await self._send_and_parse(cmd) for cmd in cmds]
+
+        self._drop_unechoed(reply)
+        return [
+            self._shared_lines(cmd, lines)
+            for cmd, lines in zip(cmds, reply.lines, strict=True)
+        ]
 
     async def _send_and_parse(self, cmd: str) -> list[str]:
         """Send command and parse response."""
         try:
-            chunks = await self._send_and_read(cmd)
+            reply = await self._send_and_read([cmd])
         except Exception as e:
             _LOGGER.warning("Telnet command failed (%s), reconnecting...", e)
             await self.disconnect()
             raise
 
-        if not chunks:
+        if not reply.lines and not reply.unechoed:
             _LOGGER.warning("No response received for command: %s", cmd)
             return []
 
-        return self._parse_response(cmd, chunks)
-
-    async def _send_and_read(self, cmd: str) -> bytearray:
-        """Send command and read raw response."""
-        if not self._writer or not self._reader:
+        if not reply.lines:
+            # Firmware that does not echo replies with just the lines
+            return self._shared_lines(cmd, reply.unechoed)
+        self._drop_unechoed(reply)
+        return self._shared_lines(cmd, reply.lines[0])
+
+    @staticmethod
+    def _drop_unechoed(reply: _Reply):
+        """Drop lines that came in ahead of a reply's first echo."""
+        # Most likely the tail of an earlier reply that was cut short, which
+        # is too stale to read as state or as a change the matrix pushed
+        if reply.unechoed:
+            _LOGGER.debug("Dropped lines before the echo: %s", reply.unechoed)
+
+    async def _send_and_read(self, cmds: list[str]) -> _Reply:
+        """Send commands in a single write and collect the reply lines.
+
+        The reply is complete as soon as the last echoed command has been
+        followed by the device prompt, or by as many lines as a bulk read is
+        known to return. The idle timeout only applies when neither arrives.
+        """
+        if not self._transport or self._transport.is_closing():
             raise RuntimeError("Not connected to matrix")
 
-        _LOGGER.debug("Sending command: %s", cmd)
-        self._writer.write((cmd + "\r\n").encode("ascii"))
-        await self._writer.drain()
-
-        # Read response until idle
-        chunks = bytearray()
+        _LOGGER.debug("Sending commands: %s", cmds)
+        loop = asyncio.get_running_loop()
+        reply = _Reply(cmds, self._expected_line_count(cmds[-1]), loop.create_future())
+        self._reply = reply
+        self._discard_until_prompt = False
+        self._last_received = loop.time()
+        reply.idle_timer = loop.call_later(
+            RESPONSE_IDLE_TIMEOUT, self._check_idle, reply
+        )
         try:
-            while True:
-                data = await asyncio.wait_for(self._reader.read(1024), timeout=0.3)
-                if not data:
-                    break
-                chunks.extend(data)
-        except TimeoutError:
-            pass
-
-        return chunks
-
-    def _parse_response(self, cmd: str, chunks: bytearray) -> list[str]:
-        """Parse raw response bytes into cleaned lines."""
-        # --- Clean and parse ---
-        filtered = bytes(b for b in chunks if b < 0x80)
-        text = filtered.decode("ascii", errors="ignore").strip()
-
-        # Split into lines, remove empty and banner/prompt lines
-        lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-        _LOGGER.debug("Parsed lines for cmd '%s': %s", cmd, lines)
-
-        # Remove echoed command and banner
-        cleaned = []
-        for line in lines:
-            # Skip command echo (exact match), banners, and prompts
-            if (
-                line == cmd
-                or line == cmd.rstrip("!")
-                or line.startswith(("********", "FW Version"))
-                or line == ">"
-                or "Welcome" in line
-            ):
-                _LOGGER.debug("Skipping line: %s", line)
-                continue
-            cleaned.append(line.strip(">"))
-
-        _LOGGER.debug("Cleaned response for cmd '%s': %s", cmd, cleaned)
-        return cleaned
+            self._transport.write(b"".join(_encode_command(cmd)[0] for cmd in cmds))
+            await reply.future
+        finally:
+            reply.idle_timer.cancel()
+            self._reply = None
+        return reply
+
+    def _expected_line_count(self, cmd: str) -> int | None:
+        """Return how many lines a bulk read returns, if the port count is known."""
+        if cmd == "r av out 0!":
+            return self._output_count or None
+        if cmd == "r link in 0!":
+            return self._input_count or None
+        return None
+
+    def _shared_lines(self, cmd: str, lines: list[str]) -> list[str]:
+        """Return a command's reply lines, as last time's list if unchanged.
+
+        A reply identical to the command's previous one returns the same list
+        object as then, which must not be modified.
+        """
+        cached = self._responses.get(cmd)
+        if cached == lines:
+            return cached
+        _LOGGER.debug("Cleaned response for cmd '%s': %s", cmd, lines)
+        self._responses[cmd] = lines
+        return lines
+
+    def _cached_parse(self, key: str, source, parser: Callable[[Any], Any]):
+        """Return parser(source), reusing the last result for the same source.
+
+        Unchanged replies come back as the same lines object, so this skips
+        parsing them again. Results are shared, so dicts come back read-only.
+        """
+        cached = self._parsed.get(key)
+        if cached is not None and cached[0] is source:
+            return cached[1]
+        result = _read_only(parser(source))
+        self._parsed[key] = (source, result)
+        return result
 
     async def _send_command(self, cmd: str) -> str:
         cleaned = await self._send_command_multiple(cmd)
@@ -136,13 +705,18 @@ class OreiMatrixClient:
         # If we got the command back or something weird, return a default
         if not type_str or "type" in type_str.lower() or len(type_str) < 3:
             _LOGGER.warning("Invalid type response: '%s', using default", type_str)
-            return "HDMI Matrix"
+            # The model named in the banner beats a made-up one
+            return self.model or "HDMI Matrix"
         return type_str
 
-    async def get_status(self) -> dict:
-        """Get full device status including input/output counts."""
+    async def get_status(self) -> Mapping:
+        """Get full device status including input/output counts, read-only."""
         lines = await self._send_command_multiple("r status!")
+        return self._cached_parse("r status!", lines, self._parse_status)
 
+    @staticmethod
+    def _parse_status(lines: list[str]) -> dict:
+        """Parse a "r status!" response."""
         status: dict = {
             "power": False,
             "input_count": 0,
@@ -152,194 +726,78 @@ class OreiMatrixClient:
             "routing": {},
         }
 
-        for line in lines:
-            line_lower = line.lower()
-
-            # Parse power
-            if "power on" in line_lower:
-                status["power"] = True
-
-            # Count inputs: "hdmi input 1: sync"
-            if "hdmi input" in line_lower and ":" in line:
-                parts = line_lower.split(":")
-                try:
-                    input_num = int(parts[0].split()[-1])
-                except (ValueError, IndexError):
-                    continue
-
-                input_count: int = status["input_count"]  # type: ignore[assignment]
-                status["input_count"] = max(input_count, input_num)
-                state = parts[1].strip()
-                is_connected = "disconnect" not in state
-                inputs_dict: dict = status["inputs"]  # type: ignore[assignment]
-                inputs_dict[input_num] = {"connected": is_connected}
-
-            # Count outputs: "hdmi output 1: disconnect" or "hdbt output 1"
-            is_output = "hdmi output" in line_lower or "hdbt output" in line_lower
-            if is_output and ":" in line:
-                parts = line_lower.split(":")
-                try:
-                    output_num = int(parts[0].split()[-1])
-                except (ValueError, IndexError):
-                    continue
-
-                output_count: int = status["output_count"]  # type: ignore[assignment]
-                status["output_count"] = max(output_count, output_num)
-                state = parts[1].strip()
-                is_connected = "disconnect" not in state
-                outputs_dict: dict = status["outputs"]  # type: ignore[assignment]
-                outputs_dict[output_num] = {"connected": is_connected}
-
-            # Parse routing: "input 1 -> output 1"
-            routing_check = (
-                "->" in line_lower and "input" in line_lower and "output" in line_lower
-            )
-            if routing_check:
-                parts = line_lower.replace("->", " ").split()
-                try:
-                    input_idx = parts.index("input") + 1
-                    output_idx = parts.index("output") + 1
-                except (ValueError, IndexError):
-                    continue
-
-                try:
-                    input_num = int(parts[input_idx])
-                    output_num = int(parts[output_idx])
-                except (ValueError, IndexError):
-                    continue
-
-                routing_dict: dict = status["routing"]  # type: ignore[assignment]
-                routing_dict[output_num] = input_num
+        for event in parse_events(lines):
+            if isinstance(event, PowerEvent):
+                status["power"] = event.on
+            elif isinstance(event, InputLinkEvent):
+                status["input_count"] = max(status["input_count"], event.input_id)
+                status["inputs"][event.input_id] = {
+                    "connected": event.state != "disconnect",
+                    "state": event.state,
+                }
+            elif isinstance(event, OutputLinkEvent):
+                status["output_count"] = max(status["output_count"], event.output_id)
+                status["outputs"][event.output_id] = {
+                    "connected": event.state != "disconnect"
+                }
+            elif isinstance(event, RouteEvent):
+                status["routing"][event.output_id] = event.input_id
 
         _LOGGER.debug("Parsed status: %s", status)
         return status
 
     async def get_power(self) -> bool:
         """Return True if matrix power is ON."""
-        res = await self._send_command("r power!")
-        return "on" in res.lower()
+        return self._parse_power(await self._send_command_multiple("r power!"))
+
+    async def set_power(self, state: bool) -> bool:
+        """Turn matrix power ON or OFF.
 
-    async def set_power(self, state: bool):
-        """Turn matrix power ON or OFF."""
+        Returns False if a later power change replaced this one unsent.
+        """
         cmd = f"s power {1 if state else 0}!"
-        await self._send_command(cmd)
+        return await self._submit_write([cmd], POWER_KEY)
 
     async def get_output_source(self, output_id: int):
         """Get the current input assigned to a given output."""
-        res = await self._send_command(f"r av out {output_id}!")
-        _LOGGER.debug("Parsing output source response: %s", res)
-
-        res = res.lower().replace("->", " -> ").replace(":", " ")
-        parts = res.split()
-        input_id = None
-
-        try:
-            for i, token in enumerate(parts):
-                if token in ("input", "in") and i + 1 < len(parts):
-                    input_id = int(parts[i + 1])
-        except ValueError:
-            _LOGGER.warning("Could not parse integers from response: %s", res)
-            return None
-
-        return input_id
-
-    async def get_output_sources(self):
-        """Get the current input assigned to a given output."""
-        results = await self._send_command_multiple("r av out 0!")
-        response = {}
+        lines = await self._send_command_multiple(f"r av out {output_id}!")
+        return self._parse_output_sources(lines).get(output_id)
 
-        for res in results:
-            res = res.lower().replace("->", " -> ").replace(":", " ")
-            parts = res.split()
-            output_id = None
-            input_id = None
-
-            try:
-                for i, token in enumerate(parts):
-                    if token in ("output", "out") and i + 1 < len(parts):
-                        output_id = int(parts[i + 1])
-                    if token in ("input", "in") and i + 1 < len(parts):
-                        input_id = int(parts[i + 1])
-                response[output_id] = input_id
-            except ValueError:
-                _LOGGER.warning("Could not parse integers from response: %s", res)
-                return None
-        return response
+    async def get_output_sources(self) -> Mapping[int, int]:
+        """Get the current input assigned to every output, read-only."""
+        lines = await self._send_command_multiple("r av out 0!")
+        return self._cached_parse("r av out 0!", lines, self._parse_output_sources)
 
     async def get_in_link(self, input_id: int):
         """Get the input state."""
-        res = await self._send_command(f"r link in {input_id}!")
-        return "disconnect" not in res.lower()
+        lines = await self._send_command_multiple(f"r link in {input_id}!")
+        state = self._parse_in_links(lines).get(input_id, "disconnect")
+        return state != "disconnect"
 
-    async def get_in_links(self):
+    async def get_in_links(self) -> Mapping[int, str]:
         """Get the input link states.
 
-        Returns dict mapping input_id to state string:
+        Returns a read-only mapping of input_id to state string:
         - "sync" = Active video signal (device on and sending video)
         - "connect" = Cable connected, no active signal (device off/standby)
         - "disconnect" = Nothing connected
         """
-        command_results = await self._send_command_multiple("r link in 0!")
-        input_states = {}
-
-        for response_line in command_results:
-            # Parse format: "hdmi input 1: sync"
-            if ":" not in response_line:
-                continue
-
-            line_parts = response_line.lower().split(":")
-            if len(line_parts) < 2:
-                continue
-
-            # Extract input number from first part
-            prefix_tokens = line_parts[0].split()
-            input_id = None
-
-            for token_index, token_value in enumerate(prefix_tokens):
-                is_input_token = token_value in ("input", "in")
-                has_next_token = token_index + 1 < len(prefix_tokens)
-
-                if is_input_token and has_next_token:
-                    try:
-                        input_id = int(prefix_tokens[token_index + 1])
-                        break
-                    except (ValueError, IndexError):
-                        _LOGGER.warning(
-                            "Could not parse input number from: %s", response_line
-                        )
-                        continue
-
-            if input_id:
-                # Extract state from second part (after colon)
-                link_state = line_parts[1].strip()
-                input_states[input_id] = link_state
-
-        return input_states
+        lines = await self._send_command_multiple("r link in 0!")
+        return self._cached_parse("r link in 0!", lines, self._parse_in_links)
 
     async def get_out_link(self, output_id: int):
         """Get the output state."""
-        res = await self._send_command(f"r link out {output_id}!")
-        return "disconnect" not in res.lower()
+        lines = await self._send_command_multiple(f"r link out {output_id}!")
+        state = self._parse_out_links(lines).get(output_id, "disconnect")
+        return state != "disconnect"
 
     async def get_out_links(self):
-        """Get the input state."""
-        results = await self._send_command_multiple("r link out 0!")
-        response = {}
-
-        for res in results:
-            res = res.lower().replace(":", " ")
-            parts = res.split()
-            output_id = None
-
-            try:
-                for i, token in enumerate(parts):
-                    if token in ("output", "out") and i + 1 < len(parts):
-                        output_id = int(parts[i + 1])
-                response[output_id] = "disconnect" not in res
-            except ValueError:
-                _LOGGER.warning("Could not parse integers from response: %s", res)
-                return None
-        return response
+        """Get whether each output is connected."""
+        lines = await self._send_command_multiple("r link out 0!")
+        return {
+            output_id: state != "disconnect"
+            for output_id, state in self._parse_out_links(lines).items()
+        }
 
     async def set_cec_in(self, input_id: int, command: str):
         """Send a CEC command to the input."""
@@ -347,17 +805,555 @@ class OreiMatrixClient:
 
     async def set_cec_out(self, output_id: int, command: str):
         """Send a CEC command to both HDMI and HDBaseT outputs."""
-        # Send to HDMI output
-        await self._send_command(f"s cec hdmi out {output_id} {command}!")
-        # Send to HDBaseT output
-        await self._send_command(f"s cec hdbt out {output_id} {command}!")
+        await self.batch(
+            [
+                f"s cec hdmi out {output_id} {command}!",
+                f"s cec hdbt out {output_id} {command}!",
+            ]
+        )
 
     async def set_output_active(self, output_id: int):
         """Set the output to active source (tells TV to switch to this input)."""
         # Send active command to both HDMI and HDBaseT
-        await self._send_command(f"s cec hdmi out {output_id} active!")
-        await self._send_command(f"s cec hdbt out {output_id} active!")
+        await self.set_cec_out(output_id, "active")
+
+    async def set_output_source(self, input_id: int, output_id: int) -> bool:
+        """Assign an input to an output.
+
+        Rapid changes to the same output within the coalescing window are
+        collapsed so that only the last one is sent. Returns False if this
+        one was replaced by a later one and never sent.
+        """
+        return await self._submit_write(
+            [f"s in {input_id} av out {output_id}!"],
+            _routing_key(output_id),
+            delay=self._coalesce_window,
+        )
+
+    async def set_output_sources(self, input_id: int, output_ids: list[int]):
+        """Assign an input to several outputs in one round trip."""
+        await self.batch(
+            [f"s in {input_id} av out {output_id}!" for output_id in output_ids]
+        )
+
+    async def get_state(self, include_links: bool = True) -> dict:
+        """Read power, routing and input link states in one round trip.
+
+        Uses a single "r status!" where the firmware reports routing in it,
+        otherwise pipelines the individual read commands. Input links are
+        always included with "r status!", and on request otherwise.
+        """
+        if self._status_polling:
+            status = await self.get_status()
+            if status["routing"]:
+                self._status_misses = 0
+                return {
+                    "power": status["power"],
+                    "outputs": status["routing"],
+                    "input_links": self._cached_parse(
+                        "status links", status, self._status_links
+                    ),
+                }
+            # A valid status without routing lines will not grow them later,
+            # while an empty or unrecognized one gets a few more tries
+            self._status_misses += 1
+            if status["inputs"] or self._status_misses >= STATUS_MISS_LIMIT:
+                _LOGGER.info("Status has no routing, polling with separate commands")
+                self._status_polling = False
+
+        cmds = ["r power!", "r av out 0!"]
+        if include_links:
+            cmds.append("r link in 0!")
+        results = await self.batch(cmds)
+        state = {
+            "power": self._parse_power(results[0]),
+            "outputs": self._cached_parse(
+                cmds[1], results[1], self._parse_output_sources
+            ),
+        }
+        if include_links:
+            state["input_links"] = self._cached_parse(
+                cmds[2], results[2], self._parse_in_links
+            )
+        return state
+
+    async def get_partial_state(
+        self, output_ids: list[int], input_ids: list[int]
+    ) -> dict:
+        """Read routing for some outputs and link states for some inputs.
+
+        Falls back to the bulk "0" read for a port type once so many of its
+        ports are wanted that reading them one by one would cost more.
+        """
+        if self._output_count and len(output_ids) * PORT_READ_COST > self._output_count:
+            output_cmds = ["r av out 0!"]
+        else:
+            output_cmds = [f"r av out {output_id}!" for output_id in output_ids]
+        if self._input_count and len(input_ids) * PORT_READ_COST > self._input_count:
+            input_cmds = ["r link in 0!"]
+        else:
+            input_cmds = [f"r link in {input_id}!" for input_id in input_ids]
+
+        results = await self.batch(output_cmds + input_cmds)
+        outputs: dict = {}
+        input_links: dict = {}
+        for cmd, lines in zip(output_cmds, results[: len(output_cmds)], strict=True):
+            outputs.update(self._cached_parse(cmd, lines, self._parse_output_sources))
+        for cmd, lines in zip(input_cmds, results[len(output_cmds) :], strict=True):
+            input_links.update(self._cached_parse(cmd, lines, self._parse_in_links))
+        return {"outputs": outputs, "input_links": input_links}
+
+    # -----------------------
+    # Response parsing
+    # -----------------------
+
+    @staticmethod
+    def _parse_notification(lines: list[str]) -> dict:
+        """Parse unsolicited lines into a partial state dict."""
+        changes: dict = {}
+        for event in parse_events(lines):
+            if isinstance(event, PowerEvent):
+                changes["power"] = event.on
+            elif isinstance(event, RouteEvent):
+                changes.setdefault("outputs", {})[event.output_id] = event.input_id
+            elif isinstance(event, InputLinkEvent):
+                changes.setdefault("input_links", {})[event.input_id] = event.state
+        return changes
+
+    @staticmethod
+    def _status_links(status: Mapping) -> dict[int, str]:
+        """Return the input link states from a parsed status."""
+        return {input_id: info["state"] for input_id, info in status["inputs"].items()}
+
+    @staticmethod
+    def _parse_power(lines: list[str]) -> bool:
+        """Parse a "power on"/"power off" response."""
+        power = False
+        for event in parse_events(lines):
+            if isinstance(event, PowerEvent):
+                power = event.on
+        return power
+
+    @staticmethod
+    def _parse_output_sources(lines: list[str]) -> dict[int, int]:
+        """Parse "input X -> output Y" lines into an output -> input dict."""
+        return {
+            event.output_id: event.input_id
+            for event in parse_events(lines)
+            if isinstance(event, RouteEvent)
+        }
+
+    @staticmethod
+    def _parse_in_links(lines: list[str]) -> dict[int, str]:
+        """Parse "hdmi input X: state" lines into an input -> state dict."""
+        return {
+            event.input_id: event.state
+            for event in parse_events(lines)
+            if isinstance(event, InputLinkEvent)
+        }
+
+    @staticmethod
+    def _parse_out_links(lines: list[str]) -> dict[int, str]:
+        """Parse "hdmi output X: state" lines into an output -> state dict."""
+        return {
+            event.output_id: event.state
+            for event in parse_events(lines)
+            if isinstance(event, OutputLinkEvent)
+        }
+
 
-    async def set_output_source(self, input_id: int, output_id: int):
-        """Assign an input to an output."""
-        await self._send_command(f"s in {input_id} av out {output_id}!")
+class _AdaptiveCoordinator(DataUpdateCoordinator):
+    """Coordinator whose poll interval follows the matrix's activity."""
+
+    @callback
+    def async_set_update_interval(self, interval: timedelta):
+        """Poll at a new interval, moving up a slower poll already scheduled."""
+        if interval == self.update_interval:
+            return
+        sooner = self.update_interval is None or interval < self.update_interval
+        _LOGGER.debug("Polling %s every %s", self.name, interval)
+        self.update_interval = interval
+        # Otherwise the new interval only starts once the old one runs out
+        if sooner and self._unsub_refresh is not None:
+            self._schedule_refresh()
+
+
+class OreiMatrixLinkCoordinator(_AdaptiveCoordinator):
+    """Polls the input link states on their own, faster cadence.
+
+    Its data is a LinkSnapshot of each input's LinkState. The main
+    coordinator sets its poll interval from the matrix's activity.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: OreiMatrixClient):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="orei_matrix_links",
+            update_interval=LINK_POLL_INTERVAL,
+            # Polls that find nothing new do not call listeners
+            always_update=False,
+        )
+        self.client = client
+        # Set while the matrix is off and link states cannot change
+        self.paused = False
+        self._remove_listener = client.add_notification_listener(
+            self._async_handle_notification
+        )
+
+    async def _async_update_data(self):
+        if self.paused and self.data is not None:
+            return self.data
+        try:
+            input_links = await self.client.get_in_links()
+        except Exception as err:
+            _LOGGER.error("Link update failed: %s", err)
+            raise UpdateFailed(err) from err
+        links = LinkSnapshot.from_mapping(input_links)
+        # Keep the current snapshot when nothing changed, see MatrixSnapshot
+        return self.data if links == self.data else links
+
+    async def async_shutdown(self) -> None:
+        """Cancel scheduled refreshes and stop listening for notifications."""
+        await super().async_shutdown()
+        self._remove_listener()
+
+    @callback
+    def async_merge(self, input_links: dict):
+        """Merge link states read or pushed elsewhere into the current data."""
+        self.async_set_updated_data((self.data or LinkSnapshot()).merge(input_links))
+
+    @callback
+    def _async_handle_notification(self, changes: dict):
+        """Merge link states the matrix pushed into the current data."""
+        if "input_links" in changes:
+            self.async_merge(changes["input_links"])
+
+
+class OreiMatrixCoordinator(_AdaptiveCoordinator):
+    """Polls the matrix routing and power and applies changes to them.
+
+    Changes are applied to the current data as soon as the matrix has
+    accepted them, and only the ports they touched are read back. Its data
+    is a MatrixSnapshot; input link states live in the separate link
+    coordinator.
+
+    Instead of waking every entity, each update of either coordinator is
+    diffed against the last one and only the power, output and input signals
+    of what changed are sent.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: OreiMatrixClient,
+        type_str: str,
+        links: OreiMatrixLinkCoordinator,
+        input_names: list[str],
+        skip_noop_writes: bool = False,
+    ):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="orei_matrix",
+            update_interval=FAST_POLL_INTERVAL,
+            # Polls that find nothing new do not call listeners
+            always_update=False,
+        )
+        self.client = client
+        self.links = links
+        self._type = type_str
+        # Lookups over the latest routing, rebuilt whenever it changes
+        self.routing = RoutingView.from_names(input_names)
+        # Drop routing/power writes the latest snapshot shows are already done
+        self._skip_noop_writes = skip_noop_writes
+        # Longest interval polling backs off to while nothing changes
+        self._idle_interval = IDLE_POLL_INTERVAL
+        # Polls in a row that found changes while the matrix should push them
+        self._missed_pushes = 0
+        self._dirty_outputs: set[int] = set()
+        self._dirty_inputs: set[int] = set()
+        self._read_back = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=READ_BACK_DELAY,
+            immediate=False,
+            function=self._async_read_back,
+        )
+        self._remove_listener = client.add_notification_listener(
+            self._async_handle_notification
+        )
+        # Last data sent out, to diff the next update against
+        self._dispatched: MatrixSnapshot | None = None
+        self._dispatched_links = LinkSnapshot()
+        # These also keep both coordinators polling, as entities do not listen
+        self._remove_dispatchers = [
+            self.async_add_listener(self._async_dispatch_changes),
+            links.async_add_listener(self._async_dispatch_link_changes),
+        ]
+
+    async def _async_update_data(self):
+        try:
+            # Entities show nothing but power while the matrix is off, so
+            # keep the last routing until it comes back on
+            powered_off = self.data is not None and not self.data.power
+            if powered_off and not await self.client.get_power():
+                self._adjust_interval(power=False, changed=False)
+                return self.data
+            state = await self.client.get_state(include_links=False)
+        except Exception as err:
+            _LOGGER.error("Update failed: %s", err)
+            raise UpdateFailed(err) from err
+
+        # "r status!" answers link states too, which saves the link poll
+        input_links = state.pop("input_links", None)
+        if input_links:
+            self.links.async_merge(input_links)
+
+        power = state["power"]
+        outputs = RoutingSnapshot.from_mapping(state["outputs"])
+        if self.data is None:
+            data = MatrixSnapshot(power=power, outputs=outputs, type=self._type)
+        else:
+            data = self.data.evolve(power=power, outputs=outputs)
+            if data is not self.data:
+                self._count_missed_push()
+        self._adjust_interval(power=data.power, changed=data is not self.data)
+        return data
+
+    def _count_missed_push(self):
+        """Stop relying on pushes once polls keep finding changes first."""
+        if self._idle_interval != RECONCILE_INTERVAL:
+            return
+        self._missed_pushes += 1
+        if self._missed_pushes < MISSED_PUSH_LIMIT:
+            return
+        _LOGGER.debug(
+            "Matrix does not push every change, backing off to %s again",
+            IDLE_POLL_INTERVAL,
+        )
+        self._idle_interval = IDLE_POLL_INTERVAL
+
+    def _adjust_interval(self, power: bool, changed: bool):
+        """Pick the next poll interval from the latest activity and power."""
+        self.links.paused = not power
+        if not power:
+            interval = POWER_OFF_POLL_INTERVAL
+        elif changed:
+            interval = FAST_POLL_INTERVAL
+        else:
+            current = self.update_interval or FAST_POLL_INTERVAL
+            interval = min(current * 2, self._idle_interval)
+
+        self.async_set_update_interval(interval)
+        self._async_adjust_link_interval()
+
+    @callback
+    def _async_adjust_link_interval(self):
+        """Poll link states as often as the matrix's activity calls for."""
+        if self.links.paused:
+            interval = POWER_OFF_POLL_INTERVAL
+        elif self._idle_interval == RECONCILE_INTERVAL:
+            interval = RECONCILE_INTERVAL
+        elif self.update_interval < self._idle_interval:
+            interval = LINK_POLL_INTERVAL
+        else:
+            interval = LINK_IDLE_POLL_INTERVAL
+        self.links.async_set_update_interval(interval)
+
+    @callback
+    def _async_poll_soon(self):
+        """Poll fast for a while after a user action."""
+        self.async_set_update_interval(FAST_POLL_INTERVAL)
+        self._async_adjust_link_interval()
+
+    async def async_shutdown(self) -> None:
+        """Cancel scheduled refreshes and read-backs."""
+        await super().async_shutdown()
+        await self._read_back.async_shutdown()
+        self._remove_listener()
+        for remove_dispatcher in self._remove_dispatchers:
+            remove_dispatcher()
+        self._remove_dispatchers.clear()
+
+    @callback
+    def _async_dispatch_changes(self):
+        """Signal the entities whose power or routing changed."""
+        old, new = self._dispatched, self.data
+        self._dispatched = new
+        if new is None or new is old:
+            return
+
+        entry_id = self.config_entry.entry_id
+        if old is None or old.power != new.power:
+            # Every entity's availability follows power
+            async_dispatcher_send(self.hass, SIGNAL_POWER_UPDATED.format(entry_id))
+
+        old_outputs = old.outputs if old else RoutingSnapshot()
+        if old_outputs is new.outputs:
+            return
+        self.routing = self.routing.with_outputs(new.outputs)
+        outputs = old_outputs.changed_ports(new.outputs)
+        inputs = set()
+        for output_id in outputs:
+            # Both inputs' routed outputs changed
+            for routing in (old_outputs, new.outputs):
+                if output_id in routing:
+                    inputs.add(routing[output_id])
+        self._async_signal_ports(outputs, inputs)
+
+    @callback
+    def _async_dispatch_link_changes(self):
+        """Signal the inputs whose link state changed and their outputs."""
+        old, new = self._dispatched_links, self.links.data
+        if new is None or new is old:
+            return
+        self._dispatched_links = new
+
+        inputs = old.changed_ports(new)
+        # An output's playing state follows its input's link state
+        outputs = {
+            output_id
+            for input_id in inputs
+            for output_id in self.routing.outputs_for(input_id)
+        }
+        self._async_signal_ports(outputs, inputs)
+
+    @callback
+    def _async_signal_ports(self, outputs: Iterable[int], inputs: Iterable[int]):
+        """Send the update signals of the given outputs and inputs."""
+        entry_id = self.config_entry.entry_id
+        for output_id in outputs:
+            async_dispatcher_send(
+                self.hass, SIGNAL_OUTPUT_UPDATED.format(entry_id, output_id)
+            )
+        for input_id in inputs:
+            async_dispatcher_send(
+                self.hass, SIGNAL_INPUT_UPDATED.format(entry_id, input_id)
+            )
+
+    @callback
+    def _async_handle_notification(self, changes: dict):
+        """Merge a change the matrix pushed into the current data.
+
+        Link changes are merged by the link coordinator, but any push tells
+        that polling only has to reconcile.
+        """
+        if self.data is None:
+            return
+
+        self._missed_pushes = 0
+        if self._idle_interval != RECONCILE_INTERVAL:
+            # The matrix reports changes itself, so polling only reconciles
+            _LOGGER.debug(
+                "Matrix pushes changes, backing off to %s", RECONCILE_INTERVAL
+            )
+            self._idle_interval = RECONCILE_INTERVAL
+
+        data = self.data
+        if "power" in changes:
+            data = data.evolve(power=changes["power"])
+            self.links.paused = not changes["power"]
+        if "outputs" in changes:
+            data = data.evolve(outputs=data.outputs.merge(changes["outputs"]))
+        if data is not self.data:
+            self.async_set_updated_data(data)
+        self._async_adjust_link_interval()
+
+    def _can_skip(self, key: str, current, wanted) -> bool:
+        """Return True if a write would not change the last known state."""
+        if not self._skip_noop_writes or not self.last_update_success:
+            return False
+        # A queued write may still change the state the snapshot shows
+        if self.client.has_pending(key):
+            return False
+        return current is not None and current == wanted
+
+    def _routed_input(self, output_id: int):
+        """Return the input the latest snapshot routes to an output."""
+        return self.routing.input_for(output_id)
+
+    async def async_set_output_source(self, input_id: int, output_id: int):
+        """Route an input to an output."""
+        current = self._routed_input(output_id)
+        if self._can_skip(_routing_key(output_id), current, input_id):
+            _LOGGER.debug("Output %d already on input %d", output_id, input_id)
+            return
+
+        if not await self.client.set_output_source(input_id, output_id):
+            # A later route to this output replaced ours and applies itself
+            return
+        self._async_poll_soon()
+        self._async_apply_routes(input_id, [output_id])
+        await self.async_request_read_back(outputs=[output_id])
+
+    async def async_set_output_sources(self, input_id: int, output_ids: list[int]):
+        """Route an input to several outputs."""
+        changed = [
+            output_id
+            for output_id in output_ids
+            if not self._can_skip(
+                _routing_key(output_id), self._routed_input(output_id), input_id
+            )
+        ]
+        if not changed:
+            _LOGGER.debug("Outputs %s already on input %d", output_ids, input_id)
+            return
+
+        await self.client.set_output_sources(input_id, changed)
+        self._async_poll_soon()
+        self._async_apply_routes(input_id, changed)
+        await self.async_request_read_back(outputs=changed)
+
+    async def async_set_power(self, state: bool):
+        """Turn matrix power on or off."""
+        current = self.data.power if self.data is not None else None
+        if self._can_skip(POWER_KEY, current, state):
+            _LOGGER.debug("Matrix power already %s", "on" if state else "off")
+            return
+
+        if not await self.client.set_power(state):
+            return  # Replaced by a later power change, which applies itself
+        self._async_poll_soon()
+        self.links.paused = not state
+        if self.data is not None:
+            self.async_set_updated_data(self.data.evolve(power=state))
+
+    async def async_request_read_back(
+        self, outputs: list[int] | None = None, inputs: list[int] | None = None
+    ):
+        """Schedule a read of only the given outputs and inputs."""
+        self._dirty_outputs.update(outputs or ())
+        self._dirty_inputs.update(inputs or ())
+        self._async_poll_soon()
+        await self._read_back.async_call()
+
+    async def _async_read_back(self):
+        """Read the dirty ports and merge them into the current data."""
+        outputs = sorted(self._dirty_outputs)
+        inputs = sorted(self._dirty_inputs)
+        self._dirty_outputs.clear()
+        self._dirty_inputs.clear()
+        if self.data is None or not (outputs or inputs):
+            return
+
+        try:
+            state = await self.client.get_partial_state(outputs, inputs)
+        except Exception as err:  # The next poll will catch up
+            _LOGGER.debug("Read-back failed (%s), refreshing everything", err)
+            await self.async_request_refresh()
+            return
+
+        if state["input_links"]:
+            self.links.async_merge(state["input_links"])
+        if state["outputs"]:
+            outputs = self.data.outputs.merge(state["outputs"])
+            self.async_set_updated_data(self.data.evolve(outputs=outputs))
+
+    @callback
+    def _async_apply_routes(self, input_id: int, output_ids: list[int]):
+        """Update the current data with routing the matrix has accepted."""
+        if self.data is None:
+            return
+        outputs = self.data.outputs.merge(dict.fromkeys(output_ids, input_id))
+        self.async_set_updated_data(self.data.evolve(outputs=outputs))
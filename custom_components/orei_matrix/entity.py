@@ -0,0 +1,50 @@
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.update_coordinator import (
+    BaseCoordinatorEntity,
+    CoordinatorEntity,
+)
+
+from .const import SIGNAL_POWER_UPDATED
+
+
+class OreiMatrixEntity(CoordinatorEntity):
+    """Coordinator entity that only updates when its own data changed.
+
+    Rather than listening to every coordinator update, it subscribes to the
+    signals from _update_signals, which the coordinator only sends for the
+    power, outputs and inputs that changed. Subclasses also return the slice
+    of coordinator data they render from _state_fingerprint; signals that
+    leave it untouched write nothing.
+    """
+
+    _last_fingerprint = None
+
+    def _update_signals(self) -> list[str]:
+        """Return the dispatcher signals this entity updates on."""
+        return [SIGNAL_POWER_UPDATED.format(self.coordinator.config_entry.entry_id)]
+
+    def _state_fingerprint(self):
+        """Return the coordinator data this entity renders."""
+        return self.coordinator.data.power
+
+    async def async_added_to_hass(self):
+        """Subscribe to this entity's signals instead of every update."""
+        # Skip BaseCoordinatorEntity, which adds the coordinator listener;
+        # the coordinator dispatches to this entity instead
+        await super(BaseCoordinatorEntity, self).async_added_to_hass()
+        for signal in self._update_signals():
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass, signal, self._handle_coordinator_update
+                )
+            )
+        self._last_fingerprint = self._state_fingerprint()
+
+    @callback
+    def _handle_coordinator_update(self):
+        fingerprint = self._state_fingerprint()
+        if fingerprint == self._last_fingerprint:
+            return
+        self._last_fingerprint = fingerprint
+        self.async_write_ha_state()
@@ -4,9 +4,17 @@ from homeassistant.components.media_player import MediaPlayerEntity
 from homeassistant.components.media_player.const import MediaPlayerEntityFeature
 from homeassistant.const import STATE_IDLE, STATE_OFF, STATE_PLAYING, STATE_STANDBY
 from homeassistant.core import callback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import CONF_INPUTS, CONF_OUTPUTS, CONF_SOURCES, CONF_ZONES, DOMAIN
+from .const import (
+    CONF_INPUTS,
+    CONF_OUTPUTS,
+    CONF_SOURCES,
+    CONF_ZONES,
+    DOMAIN,
+    SIGNAL_OUTPUT_UPDATED,
+)
+from .entity import OreiMatrixEntity
+from .models import LinkState
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,6 +24,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
     data = hass.data[DOMAIN][entry.entry_id]
     client = data["client"]
     coordinator = data["coordinator"]
+    link_coordinator = data["link_coordinator"]
     config = data["config"]
 
     # Support both new (outputs) and old (zones) format
@@ -24,7 +33,13 @@ async def async_setup_entry(hass, entry, async_add_entities):
 
     entities = [
         OreiMatrixOutputMediaPlayer(
-            client, coordinator, inputs, output_name, idx, entry.entry_id
+            client,
+            coordinator,
+            link_coordinator,
+            inputs,
+            output_name,
+            idx,
+            entry.entry_id,
         )
         for idx, output_name in enumerate(outputs, start=1)
     ]
@@ -32,16 +47,29 @@ async def async_setup_entry(hass, entry, async_add_entities):
     async_add_entities(entities)
 
 
-class OreiMatrixOutputMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
-    """Represents one HDMI matrix output as a media player source selector."""
+class OreiMatrixOutputMediaPlayer(OreiMatrixEntity, MediaPlayerEntity):
+    """Represents one HDMI matrix output as a media player source selector.
+
+    Routing and power come from the main coordinator, while the playing state
+    also follows the link coordinator. It updates on its output's signal.
+    """
 
     _attr_supported_features = MediaPlayerEntityFeature.SELECT_SOURCE
 
-    def __init__(self, client, coordinator, inputs, output_name, output_id, entry_id):
+    def __init__(
+        self,
+        client,
+        coordinator,
+        link_coordinator,
+        inputs,
+        output_name,
+        output_id,
+        entry_id,
+    ):
         super().__init__(coordinator)
         self._client = client
+        self._link_coordinator = link_coordinator
         self._output_id = output_id
-        self._inputs = inputs
         self._attr_source_list = inputs
         self._attr_source = None
         self._entry_id = entry_id
@@ -54,10 +82,22 @@ class OreiMatrixOutputMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
         self._attr_name = output_name
         self._attr_has_entity_name = True
 
+    async def async_added_to_hass(self):
+        """Show the routed source from the start."""
+        self._update_source()
+        await super().async_added_to_hass()
+
+    def _update_signals(self):
+        """Also update when this output's routing or input link changes."""
+        return [
+            *super()._update_signals(),
+            SIGNAL_OUTPUT_UPDATED.format(self._entry_id, self._output_id),
+        ]
+
     @property
     def available(self):
         """Entity availability based on matrix power."""
-        return bool(self.coordinator.data.get("power"))
+        return self.coordinator.data.power
 
     @property
     def state(self):
@@ -65,28 +105,28 @@ class OreiMatrixOutputMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
 
         States:
         - OFF: Matrix powered off
-        - STANDBY: No input routed, or input device off/disconnected
+        - STANDBY: No input routed, input device off/disconnected, or its
+          link state unknown
         - IDLE: Input device connected but not sending active signal
         - PLAYING: Input device sending active video signal
         """
-        if not self.coordinator.data.get("power"):
+        if not self.coordinator.data.power:
             return STATE_OFF
 
         # Get current input routed to this output
-        outputs = self.coordinator.data.get("outputs", {})
-        current_input = outputs.get(self._output_id)
+        current_input = self.coordinator.routing.input_for(self._output_id)
 
         if not current_input:
             return STATE_STANDBY  # No input routed
 
         # Check input link state
-        input_links = self.coordinator.data.get("input_links", {})
-        link_state = input_links.get(current_input, "disconnect")
+        input_links = self._link_coordinator.data or {}
+        link_state = input_links.get(current_input, LinkState.DISCONNECT)
 
-        if link_state == "sync":
+        if link_state == LinkState.SYNC:
             return STATE_PLAYING  # Active video signal
 
-        if link_state == "connect":
+        if link_state == LinkState.CONNECT:
             return STATE_IDLE  # Connected but no active signal
 
         return STATE_STANDBY  # Device disconnected
@@ -94,43 +134,49 @@ class OreiMatrixOutputMediaPlayer(CoordinatorEntity, MediaPlayerEntity):
     @property
     def device_info(self):
         """Device info for grouping and model-based naming."""
-        model = self.coordinator.data.get("type", "Unknown")
+        model = self.coordinator.data.type or "Unknown"
         name = f"Orei {model}" if model != "Unknown" else "Orei HDMI Matrix"
         return {
             "identifiers": {(DOMAIN, self._entry_id)},
             "name": name,
             "manufacturer": "Orei",
             "model": model,
+            "sw_version": self.coordinator.client.firmware_version,
             "configuration_url": f"http://{self._host}",
         }
 
-    @callback
-    def _handle_coordinator_update(self):
+    def _state_fingerprint(self):
+        """Return power, the routed input and that input's link state."""
+        power = self.coordinator.data.power
+        current_input = self.coordinator.routing.input_for(self._output_id)
+        input_links = self._link_coordinator.data or {}
+        return power, current_input, input_links.get(current_input)
+
+    def _update_source(self):
         if not self.available:
             return
-        outputs = self.coordinator.data.get("outputs")
-        if not outputs:
-            return
-        src_id = outputs.get(self._output_id)
-        if src_id and 1 <= src_id <= len(self._inputs):
-            self._attr_source = self._inputs[src_id - 1]
-            self.async_write_ha_state()
+        routing = self.coordinator.routing
+        source = routing.input_name(routing.input_for(self._output_id))
+        if source is not None:
+            self._attr_source = source
+
+    @callback
+    def _handle_coordinator_update(self):
+        self._update_source()
+        super()._handle_coordinator_update()
 
     async def async_select_source(self, source):
         """Change active source for this output."""
         if not self.available:
             _LOGGER.warning("Matrix is off; cannot change source for %s.", self.name)
             return
-        if source not in self._inputs:
+        input_id = self.coordinator.routing.input_id(source)
+        if input_id is None:
             _LOGGER.warning("Unknown source %s for %s", source, self.name)
             return
 
-        input_id = self._inputs.index(source) + 1
-
         # Just switch the input routing - user controls TV power manually
-        await self._client.set_output_source(input_id, self._output_id)
-
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_set_output_source(input_id, self._output_id)
         _LOGGER.info(
             "Switched %s to %s (input %d)",
             self.name,
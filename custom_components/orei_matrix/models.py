@@ -0,0 +1,232 @@
+import logging
+from array import array
+from collections.abc import Iterator, Mapping, Sequence
+from enum import IntEnum
+from itertools import zip_longest
+from types import MappingProxyType
+from typing import NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# Highest port id and value a PortSnapshot holds, both kept in one byte. No
+# matrix has this many ports, so anything above it is a garbled line.
+MAX_PORT = 255
+
+
+class LinkState(IntEnum):
+    """Link state the matrix reports for an input."""
+
+    DISCONNECT = 1  # Nothing connected
+    CONNECT = 2  # Cable connected, no active signal (device off/standby)
+    SYNC = 3  # Active video signal
+    UNKNOWN = 4  # A state string this integration does not know
+
+    def __str__(self) -> str:
+        return self.name.lower()
+
+    @classmethod
+    def parse(cls, state: "str | LinkState") -> "LinkState":
+        """Return the link state for a state string from the matrix."""
+        if isinstance(state, LinkState):
+            return state
+        key = state.strip().lower()
+        link_state = _LINK_STATES.get(key)
+        if link_state is None:
+            link_state = cls.UNKNOWN
+            if key not in _UNKNOWN_STATES:
+                _UNKNOWN_STATES.add(key)
+                _LOGGER.debug("Unknown link state from matrix: %r", state)
+        return link_state
+
+
+_LINK_STATES = {str(state): state for state in LinkState}
+# Unknown states already logged, so that each is only logged once
+_UNKNOWN_STATES: set[str] = set()
+
+
+class PortSnapshot(Mapping[int, int]):
+    """Immutable port id -> small int map stored in one byte per port.
+
+    Slot 0 is unused and a 0 value marks a port without a value, so equality
+    is a single array comparison.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: array | None = None):
+        self._values = values if values is not None else array("B")
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping) -> "PortSnapshot":
+        """Return a snapshot of a port id -> value dict."""
+        return cls().merge(mapping)
+
+    @staticmethod
+    def _encode(value) -> int:
+        return int(value)
+
+    def _decode(self, value: int):
+        return value
+
+    def merge(self, changes: Mapping) -> "PortSnapshot":
+        """Return a snapshot with these ports changed, or self if none did."""
+        values = None
+        for port_id, value in changes.items():
+            if port_id is None or value is None:
+                continue
+            encoded = self._encode(value)
+            if not (0 < port_id <= MAX_PORT and 0 < encoded <= MAX_PORT):
+                _LOGGER.debug("Ignoring out of range port %s: %s", port_id, value)
+                continue
+            current = self._values if values is None else values
+            if port_id < len(current) and current[port_id] == encoded:
+                continue
+            if values is None:
+                values = array("B", self._values)
+            if port_id >= len(values):
+                values.extend(bytes(port_id + 1 - len(values)))
+            values[port_id] = encoded
+        return self if values is None else type(self)(values)
+
+    def changed_ports(self, other: "PortSnapshot") -> list[int]:
+        """Return the ports whose value differs between two snapshots."""
+        return [
+            port_id
+            for port_id, (a, b) in enumerate(
+                zip_longest(self._values, other._values, fillvalue=0)
+            )
+            if a != b
+        ]
+
+    def __getitem__(self, port_id: int):
+        try:
+            value = self._values[port_id] if port_id > 0 else 0
+        except (IndexError, TypeError):
+            value = 0
+        if not value:
+            raise KeyError(port_id)
+        return self._decode(value)
+
+    def __iter__(self) -> Iterator[int]:
+        return (port_id for port_id, value in enumerate(self._values) if value)
+
+    def __len__(self) -> int:
+        return len(self._values) - self._values.count(0) if self._values else 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PortSnapshot):
+            return type(self) is type(other) and self._values == other._values
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._values.tobytes())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())})"
+
+
+class RoutingSnapshot(PortSnapshot):
+    """The input routed to each output."""
+
+    __slots__ = ()
+
+
+class LinkSnapshot(PortSnapshot):
+    """The link state of each input."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def _encode(value) -> int:
+        return LinkState.parse(value)
+
+    def _decode(self, value: int) -> LinkState:
+        return LinkState(value)
+
+
+class MatrixSnapshot(NamedTuple):
+    """Power, routing and model of the matrix at one poll.
+
+    Snapshots are never changed in place and a poll that finds nothing new
+    keeps the previous one, so "is" tells whether anything changed.
+    """
+
+    power: bool
+    outputs: RoutingSnapshot
+    type: str
+
+    def evolve(self, **changes) -> "MatrixSnapshot":
+        """Return a snapshot with these fields changed, or self if none did.
+
+        Fields equal to the current ones keep the current objects, so
+        unchanged parts are shared between snapshots.
+        """
+        changed = {
+            name: value
+            for name, value in changes.items()
+            if value != getattr(self, name)
+        }
+        return self._replace(**changed) if changed else self
+
+
+class RoutingView:
+    """Read-only routing lookups, built once per coordinator update.
+
+    Maps each output to its input and each input to the outputs it feeds,
+    plus input names to ids and back, so entities never scan the routing.
+    """
+
+    __slots__ = ("_input_ids", "_input_names", "_inputs", "_outputs")
+
+    def __init__(
+        self,
+        outputs: RoutingSnapshot,
+        input_names: Mapping[int, str],
+        input_ids: Mapping[str, int],
+    ):
+        inputs: dict[int, list[int]] = {}
+        for output_id, input_id in outputs.items():
+            inputs.setdefault(input_id, []).append(output_id)
+
+        self._outputs = outputs
+        self._inputs = MappingProxyType(
+            {input_id: tuple(output_ids) for input_id, output_ids in inputs.items()}
+        )
+        self._input_names = input_names
+        self._input_ids = input_ids
+
+    @classmethod
+    def from_names(cls, names: Sequence[str]) -> "RoutingView":
+        """Return an empty view for inputs with the given names, from 1 up."""
+        input_names = dict(enumerate(names, start=1))
+        input_ids = {name: input_id for input_id, name in input_names.items()}
+        return cls(
+            RoutingSnapshot(),
+            MappingProxyType(input_names),
+            MappingProxyType(input_ids),
+        )
+
+    def with_outputs(self, outputs: RoutingSnapshot) -> "RoutingView":
+        """Return a view of new routing that shares these input names."""
+        return RoutingView(outputs, self._input_names, self._input_ids)
+
+    @property
+    def outputs(self) -> RoutingSnapshot:
+        """Return the input routed to each output."""
+        return self._outputs
+
+    def input_for(self, output_id: int) -> int | None:
+        """Return the input routed to an output."""
+        return self._outputs.get(output_id)
+
+    def outputs_for(self, input_id: int) -> tuple[int, ...]:
+        """Return the outputs an input is routed to, in order."""
+        return self._inputs.get(input_id, ())
+
+    def input_name(self, input_id: int | None) -> str | None:
+        """Return the name of an input."""
+        return self._input_names.get(input_id)
+
+    def input_id(self, name: str) -> int | None:
+        """Return the id of the input with a name."""
+        return self._input_ids.get(name)
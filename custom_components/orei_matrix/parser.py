@@ -0,0 +1,106 @@
+import re
+from collections.abc import Callable, Iterable
+from typing import NamedTuple
+
+
+class PowerEvent(NamedTuple):
+    """A "power on" or "power off" line."""
+
+    on: bool
+
+
+class RouteEvent(NamedTuple):
+    """An "input N -> output M" line."""
+
+    input_id: int
+    output_id: int
+
+
+class InputLinkEvent(NamedTuple):
+    """An "hdmi input N: state" line."""
+
+    input_id: int
+    state: str
+
+
+class OutputLinkEvent(NamedTuple):
+    """An "hdmi output N: state" or "hdbt output N: state" line."""
+
+    output_id: int
+    state: str
+
+
+Event = PowerEvent | RouteEvent | InputLinkEvent | OutputLinkEvent
+
+# Line shapes the firmware prints, matched from a word boundary in the
+# lowercased line. Each pattern's groups are named after its shape, and
+# firmware variants are added here rather than in the code reading events.
+_LINE_SHAPES: tuple[tuple[str, str, Callable[[re.Match], Event]], ...] = (
+    (
+        "route",
+        r"in(?:put)?\s*(?P<route_in>\d+)\s*->\s*out(?:put)?\s*(?P<route_out>\d+)",
+        lambda match: RouteEvent(int(match["route_in"]), int(match["route_out"])),
+    ),
+    (
+        "power",
+        r"power\s*:?\s*(?P<power_state>on|off)\b",
+        lambda match: PowerEvent(match["power_state"] == "on"),
+    ),
+    (
+        "input_link",
+        r"in(?:put)?\s*(?P<input_link_id>\d+)\s*:\s*(?P<input_link_state>\w+)",
+        lambda match: InputLinkEvent(
+            int(match["input_link_id"]), match["input_link_state"]
+        ),
+    ),
+    (
+        "output_link",
+        r"out(?:put)?\s*(?P<output_link_id>\d+)\s*:\s*(?P<output_link_state>\w+)",
+        lambda match: OutputLinkEvent(
+            int(match["output_link_id"]), match["output_link_state"]
+        ),
+    ),
+)
+
+# All shapes in one pattern starting at a word boundary, so each line is
+# scanned once; the outer group that matched names the shape
+_LINE_PATTERN = re.compile(
+    r"\b(?:"
+    + "|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in _LINE_SHAPES)
+    + ")"
+)
+_BUILDERS = {name: build for name, _, build in _LINE_SHAPES}
+
+
+class Banner(NamedTuple):
+    """What the matrix prints when a connection opens."""
+
+    firmware_version: str | None
+    model: str | None
+
+
+_FIRMWARE_VERSION = re.compile(r"fw\s*version\s*:?\s*(\S.*)", re.IGNORECASE)
+_WELCOME = re.compile(r"welcome\s+to\s+(\S.*)", re.IGNORECASE)
+
+
+def parse_banner(lines: Iterable[str]) -> Banner:
+    """Return the firmware version and model named in the banner lines."""
+    firmware_version = model = None
+    for line in lines:
+        if match := _FIRMWARE_VERSION.search(line):
+            firmware_version = match[1].strip()
+        elif match := _WELCOME.search(line):
+            model = match[1].strip()
+    return Banner(firmware_version, model)
+
+
+def parse_line(line: str) -> Event | None:
+    """Return the event a response line reports, or None if it reports none."""
+    if match := _LINE_PATTERN.search(line.lower()):
+        return _BUILDERS[match.lastgroup](match)
+    return None
+
+
+def parse_events(lines: Iterable[str]) -> list[Event]:
+    """Return the events in response lines, in order."""
+    return [event for line in lines if (event := parse_line(line)) is not None]
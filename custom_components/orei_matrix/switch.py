@@ -1,9 +1,10 @@
 import logging
 
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import CONF_INPUTS, CONF_SOURCES, DOMAIN
+from .const import CONF_INPUTS, CONF_SOURCES, DOMAIN, SIGNAL_INPUT_UPDATED
+from .entity import OreiMatrixEntity
+from .models import LinkState
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -12,6 +13,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
     data = hass.data[DOMAIN][entry.entry_id]
     client = data["client"]
     coordinator = data["coordinator"]
+    link_coordinator = data["link_coordinator"]
     config = data["config"]
 
     # Create power switch and input switches
@@ -23,13 +25,15 @@ async def async_setup_entry(hass, entry, async_add_entities):
     inputs = config.get(CONF_INPUTS, config.get(CONF_SOURCES, []))
     for idx, input_name in enumerate(inputs, start=1):
         entities.append(
-            OreiMatrixInputSwitch(client, coordinator, input_name, idx, entry.entry_id)
+            OreiMatrixInputSwitch(
+                client, coordinator, link_coordinator, input_name, idx, entry.entry_id
+            )
         )
 
     async_add_entities(entities)
 
 
-class OreiMatrixPowerSwitch(CoordinatorEntity, SwitchEntity):
+class OreiMatrixPowerSwitch(OreiMatrixEntity, SwitchEntity):
     """Switch for Orei HDMI Matrix power."""
 
     def __init__(self, client, coordinator, config, entry_id):
@@ -48,36 +52,42 @@ class OreiMatrixPowerSwitch(CoordinatorEntity, SwitchEntity):
     @property
     def device_info(self):
         """Device info for grouping and model-based naming."""
-        model = self.coordinator.data.get("type", "Unknown")
+        model = self.coordinator.data.type or "Unknown"
         name = f"Orei {model}" if model != "Unknown" else "Orei HDMI Matrix"
         return {
             "identifiers": {(DOMAIN, self._entry_id)},
             "name": name,
             "manufacturer": "Orei",
             "model": model,
+            "sw_version": self.coordinator.client.firmware_version,
             "configuration_url": f"http://{self._config.get('host')}",
         }
 
     @property
     def is_on(self):
-        return self.coordinator.data.get("power")
+        return self.coordinator.data.power
 
     async def async_turn_on(self, **kwargs):
-        await self._client.set_power(True)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_set_power(True)
 
     async def async_turn_off(self, **kwargs):
-        await self._client.set_power(False)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_set_power(False)
 
 
-class OreiMatrixInputSwitch(CoordinatorEntity, SwitchEntity):
-    """Represents one HDMI input source with CEC control."""
+class OreiMatrixInputSwitch(OreiMatrixEntity, SwitchEntity):
+    """Represents one HDMI input source with CEC control.
 
-    def __init__(self, client, coordinator, input_name, input_id, entry_id):
+    Its on/off state follows the link coordinator, availability and routed
+    outputs the main coordinator. It updates on its input's signal.
+    """
+
+    def __init__(
+        self, client, coordinator, link_coordinator, input_name, input_id, entry_id
+    ):
         """Initialize the input switch."""
         super().__init__(coordinator)
         self._client = client
+        self._link_coordinator = link_coordinator
         self._input_id = input_id
         self._entry_id = entry_id
         self._host = coordinator.config_entry.data.get("host")
@@ -89,10 +99,24 @@ class OreiMatrixInputSwitch(CoordinatorEntity, SwitchEntity):
         self._attr_name = input_name
         self._attr_has_entity_name = True
 
+    def _update_signals(self):
+        """Also update when this input's link state or routing changes."""
+        return [
+            *super()._update_signals(),
+            SIGNAL_INPUT_UPDATED.format(self._entry_id, self._input_id),
+        ]
+
     @property
     def available(self):
         """Entity availability based on matrix power."""
-        return bool(self.coordinator.data.get("power"))
+        return self.coordinator.data.power
+
+    def _state_fingerprint(self):
+        """Return power, this input's link state and the outputs it feeds."""
+        power = self.coordinator.data.power
+        input_links = self._link_coordinator.data or {}
+        routed = self.coordinator.routing.outputs_for(self._input_id)
+        return power, input_links.get(self._input_id), routed
 
     @property
     def is_on(self):
@@ -102,34 +126,28 @@ class OreiMatrixInputSwitch(CoordinatorEntity, SwitchEntity):
         - "sync" = Active video signal → ON
         - "connect" = Cable connected, no signal → OFF
         - "disconnect" = Nothing connected → OFF
+        - anything else = Shown as an "unknown" link state → OFF
         """
         if not self.available:
             return False
 
-        input_links = self.coordinator.data.get("input_links", {})
-        link_state = input_links.get(self._input_id, "disconnect")
+        input_links = self._link_coordinator.data or {}
+        link_state = input_links.get(self._input_id, LinkState.DISCONNECT)
 
         # Only show "on" when actively sending video
-        return link_state == "sync"
+        return link_state == LinkState.SYNC
 
     @property
     def extra_state_attributes(self):
         """Return additional state attributes."""
-        outputs = self.coordinator.data.get("outputs", {})
-        input_links = self.coordinator.data.get("input_links", {})
-
-        # Find which outputs this input is routed to
-        routed_outputs = [
-            output_id
-            for output_id, input_id in outputs.items()
-            if input_id == self._input_id
-        ]
+        input_links = self._link_coordinator.data or {}
+        routed_outputs = list(self.coordinator.routing.outputs_for(self._input_id))
 
-        link_state = input_links.get(self._input_id, "disconnect")
+        link_state = input_links.get(self._input_id, LinkState.DISCONNECT)
 
         return {
             "input_id": self._input_id,
-            "link_state": link_state,
+            "link_state": str(link_state),
             "routed_to_outputs": routed_outputs if routed_outputs else "None",
             "output_count": len(routed_outputs),
         }
@@ -137,13 +155,14 @@ class OreiMatrixInputSwitch(CoordinatorEntity, SwitchEntity):
     @property
     def device_info(self):
         """Device info for grouping under the matrix."""
-        model = self.coordinator.data.get("type", "Unknown")
+        model = self.coordinator.data.type or "Unknown"
         name = f"Orei {model}" if model != "Unknown" else "Orei HDMI Matrix"
         return {
             "identifiers": {(DOMAIN, self._entry_id)},
             "name": name,
             "manufacturer": "Orei",
             "model": model,
+            "sw_version": self.coordinator.client.firmware_version,
             "configuration_url": f"http://{self._host}",
         }
 
@@ -154,8 +173,8 @@ class OreiMatrixInputSwitch(CoordinatorEntity, SwitchEntity):
             return
 
         await self._client.set_cec_in(self._input_id, "on")
+        await self.coordinator.async_request_read_back(inputs=[self._input_id])
         _LOGGER.info("Sent CEC power on to %s (input %d)", self.name, self._input_id)
-        await self.coordinator.async_request_refresh()
 
     async def async_turn_off(self, **kwargs):
         """Send CEC power off command to this input."""
@@ -164,5 +183,5 @@ class OreiMatrixInputSwitch(CoordinatorEntity, SwitchEntity):
             return
 
         await self._client.set_cec_in(self._input_id, "off")
+        await self.coordinator.async_request_read_back(inputs=[self._input_id])
         _LOGGER.info("Sent CEC power off to %s (input %d)", self.name, self._input_id)
-        await self.coordinator.async_request_refresh()
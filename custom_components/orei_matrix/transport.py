@@ -0,0 +1,156 @@
+import asyncio
+from collections.abc import Callable
+
+# The matrix prints this prompt once it has finished answering a command.
+# Received lines never start with it, so it also stands for a prompt among
+# them.
+PROMPT = ">"
+
+# Noise above ASCII left once telnet commands are removed
+_NON_ASCII = bytes(range(0x80, 0x100))
+
+# Telnet command bytes (RFC 854)
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+SE = 240
+
+# Options the matrix may turn on at its end: it echoes the commands that
+# replies are split on, and suppresses go-ahead
+_REMOTE_OPTIONS = frozenset({1, 3})  # ECHO, SUPPRESS-GO-AHEAD
+# Options the matrix may ask us to turn on
+_LOCAL_OPTIONS = frozenset({3})  # SUPPRESS-GO-AHEAD
+
+# Where the telnet parser is between received chunks
+_DATA, _COMMAND, _OPTION, _SUBNEGOTIATION, _SUBNEGOTIATION_IAC = range(5)
+
+
+def _take_prompts(text: str, items: list[str]) -> str:
+    """Move the prompts at the start of text to items and return the rest."""
+    while text.startswith(PROMPT):
+        items.append(PROMPT)
+        text = text[1:].lstrip()
+    return text
+
+
+class MatrixProtocol(asyncio.Protocol):
+    """Splits what the matrix sends into lines as it arrives.
+
+    Every chunk received is handed on as one list, possibly empty, of the
+    complete, stripped, non-empty lines in it, with PROMPT for every prompt.
+    The prompt does not end its line, so it is handed on straight away rather
+    than waiting for the rest of the line.
+
+    Telnet commands are removed from each chunk as it arrives, picking up
+    where the previous chunk left off, and option requests are answered
+    right away so that nothing waits on the negotiation.
+    """
+
+    def __init__(
+        self,
+        on_received: Callable[[list[str]], None],
+        on_lost: Callable[[Exception | None], None],
+    ):
+        self._on_received = on_received
+        self._on_lost = on_lost
+        self._buffer = bytearray()
+        self._transport: asyncio.Transport | None = None
+        self._telnet_state = _DATA
+        self._telnet_verb = 0
+        # Option -> whether it is on, at either end
+        self._remote_options: dict[int, bool] = {}
+        self._local_options: dict[int, bool] = {}
+
+    def connection_made(self, transport: asyncio.Transport):
+        self._transport = transport
+
+    def data_received(self, data: bytes):
+        if self._telnet_state != _DATA or b"\xff" in data:
+            data = self._strip_telnet(data)
+        buffer = self._buffer
+        buffer += data.translate(None, _NON_ASCII)
+        items: list[str] = []
+
+        end = buffer.rfind(b"\n")
+        if end >= 0:
+            # Decode every complete line in one go
+            for line in buffer[:end].decode("ascii").split("\n"):
+                if line := _take_prompts(line.strip(), items):
+                    items.append(line)
+            del buffer[: end + 1]
+
+        if buffer.lstrip().startswith(b">"):
+            buffer[:] = _take_prompts(buffer.decode("ascii").lstrip(), items).encode()
+
+        self._on_received(items)
+
+    def connection_lost(self, exc: Exception | None):
+        self._buffer.clear()
+        self._transport = None
+        self._on_lost(exc)
+
+    def _strip_telnet(self, data: bytes) -> bytes:
+        """Return data without telnet commands, answering option requests."""
+        text = bytearray()
+        answers = bytearray()
+        state = self._telnet_state
+        pos = 0
+        while pos < len(data):
+            if state == _DATA:
+                # Copy everything up to the next command in one go
+                iac = data.find(IAC, pos)
+                if iac < 0:
+                    text += data[pos:]
+                    break
+                text += data[pos:iac]
+                pos = iac + 1
+                state = _COMMAND
+                continue
+
+            byte = data[pos]
+            pos += 1
+            if state == _COMMAND:
+                if byte in (DO, DONT, WILL, WONT):
+                    self._telnet_verb = byte
+                    state = _OPTION
+                elif byte == SB:
+                    state = _SUBNEGOTIATION
+                else:
+                    # IAC IAC is a literal 0xff, which is noise here anyway
+                    state = _DATA
+            elif state == _OPTION:
+                answers += self._negotiate(self._telnet_verb, byte)
+                state = _DATA
+            elif state == _SUBNEGOTIATION:
+                if byte == IAC:
+                    state = _SUBNEGOTIATION_IAC
+            else:
+                # IAC SE ends the subnegotiation, IAC IAC is part of it
+                state = _DATA if byte == SE else _SUBNEGOTIATION
+
+        self._telnet_state = state
+        if answers and self._transport:
+            self._transport.write(answers)
+        return bytes(text)
+
+    def _negotiate(self, verb: int, option: int) -> bytes:
+        """Return the answer to an option request, if it needs one."""
+        if verb in (WILL, WONT):
+            agreed, supported = self._remote_options, _REMOTE_OPTIONS
+            accept, refuse = DO, DONT
+        else:
+            agreed, supported = self._local_options, _LOCAL_OPTIONS
+            accept, refuse = WILL, WONT
+        requested = verb in (WILL, DO)
+        # Requests to enter the state an option is already in go unanswered,
+        # so the two ends never keep acknowledging each other. Options start
+        # off, and a refused one stays off, so the peer asking again for it
+        # gets the refusal again.
+        if agreed.get(option, False) == requested:
+            return b""
+        enable = requested and option in supported
+        agreed[option] = enable
+        return bytes((IAC, accept if enable else refuse, option))
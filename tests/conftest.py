@@ -0,0 +1,10 @@
+import pytest
+from homeassistant.core import HomeAssistant
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    """Return a bare Home Assistant instance, enough for dispatcher signals."""
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
@@ -0,0 +1,274 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.orei_matrix import coordinator as coordinator_module
+from custom_components.orei_matrix.coordinator import (
+    STATUS_MISS_LIMIT,
+    OreiMatrixClient,
+    _Reply,
+)
+from custom_components.orei_matrix.transport import PROMPT
+
+
+def _unechoed_reply(cmds: list[str], lines: list[str]) -> _Reply:
+    """Return a finished reply from firmware that does not echo commands."""
+    reply = _Reply(cmds, None, asyncio.get_running_loop().create_future())
+    reply.unechoed.extend(lines)
+    return reply
+
+
+@pytest.fixture
+def client():
+    """Return a client that records what it would send one write at a time."""
+    client = OreiMatrixClient("matrix")
+    client.writes = []
+    client.replies = []
+
+    async def send_and_read(cmds):
+        client.writes.append(list(cmds))
+        return client.replies.pop(0)
+
+    client._send_and_read = send_and_read
+    return client
+
+
+async def test_unechoed_write_batch_is_not_sent_again(client):
+    cmds = ["s cec hdmi out 1 on!", "s cec hdbt out 1 on!"]
+    client.replies = [_unechoed_reply(cmds, ["ok"])]
+
+    assert await client._execute(cmds) == [[], []]
+    assert client.writes == [cmds]
+    assert not client._pipelining
+
+
+async def test_unechoed_read_batch_is_read_again_one_at_a_time(client):
+    cmds = ["r power!", "r type!"]
+    client.replies = [
+        _unechoed_reply(cmds, ["power on", "UHD"]),
+        _unechoed_reply(cmds[:1], ["power on"]),
+        _unechoed_reply(cmds[1:], ["UHD"]),
+    ]
+
+    assert await client._execute(cmds) == [["power on"], ["UHD"]]
+    assert client.writes == [cmds, ["r power!"], ["r type!"]]
+    assert not client._pipelining
+
+
+async def test_lines_before_the_echo_are_not_notified(client):
+    notifications = []
+    client.add_notification_listener(notifications.append)
+    reply = _unechoed_reply(["r power!"], ["input 3 -> output 1"])
+    reply.lines.append(["power on"])
+    client.replies = [reply]
+
+    assert await client._execute(["r power!"]) == [["power on"]]
+    assert notifications == []
+
+
+def _answer_reads(client, replies: dict[str, list[str]]):
+    """Make the client's batches answer each read from a fixed reply."""
+    client.reads = []
+
+    async def batch(cmds):
+        client.reads.extend(cmds)
+        return [replies[cmd] for cmd in cmds]
+
+    client.batch = batch
+
+
+async def test_status_without_routing_lines_stops_status_polling(client):
+    _answer_reads(
+        client,
+        {
+            "r status!": ["power on", "hdmi input 1: sync"],
+            "r power!": ["power on"],
+            "r av out 0!": ["input 1 -> output 1"],
+        },
+    )
+
+    for _ in range(2):
+        state = await client.get_state(include_links=False)
+
+    assert state == {"power": True, "outputs": {1: 1}}
+    assert client.reads.count("r status!") == 1
+
+
+async def test_empty_status_stops_status_polling_after_a_few_tries(client):
+    _answer_reads(
+        client,
+        {"r status!": [], "r power!": ["power on"], "r av out 0!": []},
+    )
+
+    for _ in range(STATUS_MISS_LIMIT + 2):
+        await client.get_state(include_links=False)
+
+    assert client.reads.count("r status!") == STATUS_MISS_LIMIT
+
+
+async def test_cached_parse_results_are_shared_and_read_only(client):
+    lines = ["hdmi input 1: sync"]
+    _answer_reads(client, {"r link in 0!": lines})
+
+    first = await client.get_in_links()
+    second = await client.get_in_links()
+
+    assert first is second
+    assert first == {1: "sync"}
+    with pytest.raises(TypeError):
+        first[1] = "connect"
+
+
+async def test_cached_status_is_read_only_all_the_way_down(client):
+    _answer_reads(client, {"r status!": ["power on", "hdmi input 1: sync"]})
+
+    status = await client.get_status()
+
+    with pytest.raises(TypeError):
+        status["inputs"][1]["state"] = "connect"
+
+
+@pytest.mark.parametrize(
+    ("output_ids", "input_ids", "reads"),
+    [
+        ([1, 2], [3], ["r av out 1!", "r av out 2!", "r link in 3!"]),
+        ([1, 2, 3], [1, 2, 3], ["r av out 0!", "r link in 0!"]),
+    ],
+)
+async def test_partial_state_switches_to_bulk_reads(output_ids, input_ids, reads):
+    client = OreiMatrixClient("matrix", input_count=8, output_count=8)
+    _answer_reads(
+        client,
+        {
+            "r av out 0!": ["input 1 -> output 1", "input 4 -> output 2"],
+            "r av out 1!": ["input 1 -> output 1"],
+            "r av out 2!": ["input 4 -> output 2"],
+            "r link in 0!": ["hdmi input 1: sync", "hdmi input 3: connect"],
+            "r link in 3!": ["hdmi input 3: connect"],
+        },
+    )
+
+    state = await client.get_partial_state(output_ids, input_ids)
+
+    assert client.reads == reads
+    assert state["outputs"] == {1: 1, 2: 4}
+    assert state["input_links"][3] == "connect"
+
+
+@pytest.fixture
+def connected_client():
+    """Return a client on a fake transport, fed through _data_received."""
+    client = OreiMatrixClient("matrix", input_count=2, output_count=2)
+    client._transport = MagicMock()
+    client._transport.is_closing.return_value = False
+    client._protocol = MagicMock()
+    return client
+
+
+async def _reply_to(client, cmds: list[str], *chunks: list[str]) -> _Reply:
+    """Send commands and feed chunks of received lines until they finish."""
+    task = asyncio.create_task(client._send_and_read(cmds))
+    await asyncio.sleep(0)
+    for chunk in chunks:
+        client._data_received(chunk)
+    return await asyncio.wait_for(task, 1)
+
+
+async def test_reply_is_split_on_each_echo(connected_client):
+    reply = await _reply_to(
+        connected_client,
+        ["r power!", "r type!"],
+        ["r power!", "power on", PROMPT],
+        ["r type", "UHD48", PROMPT],
+    )
+
+    assert reply.lines == [["power on"], ["UHD48"]]
+    assert reply.unechoed == []
+    assert reply.prompted
+    connected_client._transport.write.assert_called_once_with(
+        b"r power!\r\nr type!\r\n"
+    )
+
+
+async def test_prompt_between_pipelined_commands_does_not_finish(connected_client):
+    task = asyncio.create_task(connected_client._send_and_read(["r power!", "r type!"]))
+    await asyncio.sleep(0)
+    connected_client._data_received(["r power!", "power on", PROMPT])
+    await asyncio.sleep(0)
+
+    assert not task.done()
+    task.cancel()
+
+
+async def test_lines_before_the_first_echo_are_kept_apart(connected_client):
+    reply = await _reply_to(
+        connected_client,
+        ["r power!"],
+        ["input 1 -> output 2", "r power!", "power on", PROMPT],
+    )
+
+    assert reply.unechoed == ["input 1 -> output 2"]
+    assert reply.lines == [["power on"]]
+
+
+async def test_bulk_read_finishes_on_its_last_line_and_drops_the_tail(
+    connected_client,
+):
+    notifications = []
+    connected_client.add_notification_listener(notifications.append)
+
+    reply = await _reply_to(
+        connected_client,
+        ["r av out 0!"],
+        ["r av out 0!", "input 1 -> output 1", "input 2 -> output 2"],
+    )
+    assert reply.lines == [["input 1 -> output 1", "input 2 -> output 2"]]
+    assert not reply.prompted
+
+    # The tail is dropped up to the prompt, later lines are pushes again
+    connected_client._data_received(["input 2 -> output 1", PROMPT])
+    connected_client._data_received(["input 3 -> output 1"])
+    assert notifications == [{"outputs": {1: 3}}]
+
+
+async def test_reply_without_prompt_finishes_when_idle(connected_client, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "RESPONSE_IDLE_TIMEOUT", 0.01)
+
+    reply = await _reply_to(connected_client, ["r power!"], ["power on"])
+
+    assert reply.unechoed == ["power on"]
+    assert reply.lines == []
+
+
+async def test_lost_connection_fails_the_waiting_command(connected_client):
+    task = asyncio.create_task(connected_client._send_and_read(["r power!"]))
+    await asyncio.sleep(0)
+    connected_client._connection_lost(connected_client._protocol, None)
+
+    with pytest.raises(ConnectionError):
+        await task
+
+
+async def test_loss_of_a_replaced_connection_is_ignored(connected_client):
+    task = asyncio.create_task(connected_client._send_and_read(["r power!"]))
+    await asyncio.sleep(0)
+    connected_client._connection_lost(MagicMock(), None)
+    connected_client._data_received(["r power!", "power on", PROMPT])
+
+    assert (await task).lines == [["power on"]]
+
+
+async def test_banner_is_read_up_to_the_first_prompt(connected_client):
+    client = connected_client
+    client._handshake = asyncio.get_running_loop().create_future()
+    client._banner = []
+    notifications = []
+    client.add_notification_listener(notifications.append)
+
+    client._data_received(["Welcome to UHD48-EX230-K", "power on"])
+    client._data_received([PROMPT, "input 1 -> output 2"])
+
+    assert client._handshake.done()
+    assert client._banner == ["Welcome to UHD48-EX230-K", "power on"]
+    assert notifications == [{"outputs": {2: 1}}]
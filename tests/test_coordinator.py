@@ -0,0 +1,312 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.orei_matrix import coordinator as coordinator_module
+from custom_components.orei_matrix.coordinator import (
+    FAST_POLL_INTERVAL,
+    IDLE_POLL_INTERVAL,
+    LINK_IDLE_POLL_INTERVAL,
+    LINK_POLL_INTERVAL,
+    MISSED_PUSH_LIMIT,
+    POWER_OFF_POLL_INTERVAL,
+    RECONCILE_INTERVAL,
+    OreiMatrixClient,
+    OreiMatrixCoordinator,
+    OreiMatrixLinkCoordinator,
+)
+from custom_components.orei_matrix.models import LinkState
+
+
+class _FakeClient:
+    """Client stand-in that answers polls with whatever state is set."""
+
+    def __init__(self):
+        self.state = {"power": True, "outputs": {1: 1, 2: 2}}
+        self.listeners = []
+        self.state_reads = 0
+        self.get_in_links = AsyncMock(return_value={1: "sync", 2: "connect"})
+        self.get_power = AsyncMock(return_value=True)
+        self.get_partial_state = AsyncMock(
+            return_value={"outputs": {2: 1}, "input_links": {2: "sync"}}
+        )
+
+    def add_notification_listener(self, listener):
+        self.listeners.append(listener)
+        return lambda: self.listeners.remove(listener)
+
+    async def get_state(self, include_links=True):
+        self.state_reads += 1
+        return {"power": self.state["power"], "outputs": dict(self.state["outputs"])}
+
+    def push(self, changes):
+        for listener in list(self.listeners):
+            listener(changes)
+
+
+@pytest.fixture
+async def coordinator(hass):
+    client = _FakeClient()
+    links = OreiMatrixLinkCoordinator(hass, client)
+    coordinator = OreiMatrixCoordinator(hass, client, "UHD", links, ["A", "B"])
+    coordinator.config_entry = links.config_entry = MagicMock(
+        entry_id="entry", pref_disable_polling=False
+    )
+    await coordinator.async_refresh()
+    await links.async_refresh()
+    yield coordinator
+    await coordinator.async_shutdown()
+    await links.async_shutdown()
+
+
+async def test_push_switches_to_reconcile_polling(coordinator):
+    coordinator.client.push({"outputs": {1: 2}})
+
+    assert coordinator.data.outputs[1] == 2
+    assert coordinator._idle_interval == RECONCILE_INTERVAL
+
+
+async def test_reconcile_polling_ends_when_polls_keep_finding_changes(coordinator):
+    coordinator.client.push({"outputs": {1: 2}})
+
+    for poll in range(MISSED_PUSH_LIMIT):
+        assert coordinator._idle_interval == RECONCILE_INTERVAL
+        coordinator.client.state["outputs"][2] = 1 + poll % 2
+        await coordinator.async_refresh()
+
+    assert coordinator._idle_interval == IDLE_POLL_INTERVAL
+
+
+async def test_push_resets_missed_pushes(coordinator):
+    coordinator.client.push({"outputs": {1: 2}})
+    for poll in range(MISSED_PUSH_LIMIT - 1):
+        coordinator.client.state["outputs"][2] = 1 + poll % 2
+        await coordinator.async_refresh()
+
+    coordinator.client.push({"outputs": {2: 2}})
+    coordinator.client.state["outputs"][2] = 1
+    await coordinator.async_refresh()
+
+    assert coordinator._idle_interval == RECONCILE_INTERVAL
+
+
+async def test_poll_soon_moves_up_the_scheduled_poll(coordinator):
+    coordinator.async_set_update_interval(IDLE_POLL_INTERVAL)
+    coordinator._schedule_refresh = MagicMock()
+
+    coordinator._async_poll_soon()
+
+    assert coordinator.update_interval == FAST_POLL_INTERVAL
+    coordinator._schedule_refresh.assert_called_once()
+
+
+async def test_slower_interval_keeps_the_scheduled_poll(coordinator):
+    coordinator._schedule_refresh = MagicMock()
+
+    coordinator.async_set_update_interval(IDLE_POLL_INTERVAL)
+
+    assert coordinator.update_interval == IDLE_POLL_INTERVAL
+    coordinator._schedule_refresh.assert_not_called()
+
+
+async def test_links_follow_the_matrix_activity(coordinator):
+    links = coordinator.links
+    assert links.update_interval == LINK_POLL_INTERVAL
+
+    coordinator.async_set_update_interval(IDLE_POLL_INTERVAL)
+    await coordinator.async_refresh()
+    assert links.update_interval == LINK_IDLE_POLL_INTERVAL
+
+    coordinator._async_poll_soon()
+    assert links.update_interval == LINK_POLL_INTERVAL
+
+    coordinator.client.state["power"] = False
+    await coordinator.async_refresh()
+    assert links.update_interval == POWER_OFF_POLL_INTERVAL
+
+
+async def test_link_push_switches_links_to_reconcile_polling(coordinator):
+    coordinator.client.push({"input_links": {2: "sync"}})
+
+    assert coordinator.links.data[2] == LinkState.SYNC
+    assert coordinator.links.update_interval == RECONCILE_INTERVAL
+
+
+async def test_poll_drops_out_of_range_routing(coordinator):
+    coordinator.client.state["outputs"] = {1: 300, 2: 2}
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert dict(coordinator.data.outputs) == {2: 2}
+
+
+async def test_read_back_reads_all_dirty_ports_once_and_merges_them(coordinator):
+    client = coordinator.client
+    await coordinator.async_request_read_back(outputs=[2])
+    await coordinator.async_request_read_back(outputs=[1], inputs=[2])
+
+    await coordinator._async_read_back()
+    await coordinator._async_read_back()
+
+    client.get_partial_state.assert_awaited_once_with([1, 2], [2])
+    assert dict(coordinator.data.outputs) == {1: 1, 2: 1}
+    assert coordinator.links.data[2] == LinkState.SYNC
+
+
+async def test_failed_read_back_refreshes_everything(coordinator):
+    coordinator.client.get_partial_state.side_effect = ConnectionError
+    coordinator.async_request_refresh = AsyncMock()
+    data = coordinator.data
+
+    await coordinator.async_request_read_back(outputs=[2])
+    await coordinator._async_read_back()
+
+    coordinator.async_request_refresh.assert_awaited_once()
+    assert coordinator.data is data
+
+
+async def test_only_power_is_read_while_the_matrix_is_off(coordinator):
+    client = coordinator.client
+    client.state["power"] = False
+    await coordinator.async_refresh()
+    data = coordinator.data
+    client.get_power.return_value = False
+    client.state_reads = 0
+
+    await coordinator.async_refresh()
+
+    assert coordinator.data is data
+    assert client.state_reads == 0
+    client.get_power.assert_awaited_once()
+    assert coordinator.update_interval == POWER_OFF_POLL_INTERVAL
+
+
+async def test_routing_is_read_again_once_the_matrix_is_on(coordinator):
+    client = coordinator.client
+    client.state["power"] = False
+    await coordinator.async_refresh()
+    client.state = {"power": True, "outputs": {1: 2, 2: 2}}
+
+    await coordinator.async_refresh()
+
+    assert coordinator.data.power
+    assert dict(coordinator.data.outputs) == {1: 2, 2: 2}
+
+
+@pytest.fixture
+def signals(monkeypatch):
+    """Record the dispatcher signals the coordinators send."""
+    sent = []
+    monkeypatch.setattr(
+        coordinator_module,
+        "async_dispatcher_send",
+        lambda hass, signal: sent.append(signal),
+    )
+    return sent
+
+
+async def test_route_change_signals_only_the_ports_involved(coordinator, signals):
+    coordinator.client.push({"outputs": {1: 2}})
+
+    assert sorted(signals) == [
+        "orei_matrix_entry_input_1",
+        "orei_matrix_entry_input_2",
+        "orei_matrix_entry_output_1",
+    ]
+
+
+async def test_poll_without_changes_sends_no_signals(coordinator, signals):
+    await coordinator.async_refresh()
+    await coordinator.links.async_refresh()
+
+    assert signals == []
+
+
+async def test_power_change_signals_power_only(coordinator, signals):
+    coordinator.client.push({"power": False})
+
+    assert signals == ["orei_matrix_entry_power"]
+
+
+async def test_link_change_signals_the_input_and_its_outputs(coordinator, signals):
+    coordinator.client.push({"input_links": {2: "sync"}})
+
+    assert sorted(signals) == [
+        "orei_matrix_entry_input_2",
+        "orei_matrix_entry_output_2",
+    ]
+
+
+@pytest.fixture
+async def skipping(hass):
+    """Return a no-op skipping coordinator on a client with a fake connection."""
+    client = OreiMatrixClient("matrix", coalesce_window=0.01)
+    client.get_state = AsyncMock(return_value={"power": True, "outputs": {1: 1}})
+    client.get_in_links = AsyncMock(return_value={})
+    client._ensure_connected = AsyncMock()
+    client.sent = []
+    # Cleared by a test to hold the command on the wire until it is set
+    client.gate = asyncio.Event()
+    client.gate.set()
+
+    async def execute(cmds):
+        client.sent.append(list(cmds))
+        await client.gate.wait()
+        return [[] for _ in cmds]
+
+    client._execute = execute
+    links = OreiMatrixLinkCoordinator(hass, client)
+    coordinator = OreiMatrixCoordinator(
+        hass, client, "UHD", links, ["A", "B"], skip_noop_writes=True
+    )
+    coordinator.config_entry = links.config_entry = MagicMock(
+        entry_id="entry", pref_disable_polling=False
+    )
+    await coordinator.async_refresh()
+    yield coordinator
+    await coordinator.async_shutdown()
+    await links.async_shutdown()
+    await client.close()
+
+
+async def test_writes_the_snapshot_shows_done_are_skipped(skipping):
+    await skipping.async_set_output_source(1, 1)
+    await skipping.async_set_output_sources(1, [1])
+    await skipping.async_set_power(True)
+
+    assert skipping.client.sent == []
+
+
+async def test_only_the_routes_not_done_are_written(skipping):
+    await skipping.async_set_output_sources(2, [1, 2])
+    await skipping.async_set_output_sources(1, [1, 2])
+
+    assert skipping.client.sent == [
+        ["s in 2 av out 1!", "s in 2 av out 2!"],
+        ["s in 1 av out 1!", "s in 1 av out 2!"],
+    ]
+
+
+async def test_route_behind_a_batch_on_the_wire_is_not_skipped(skipping):
+    client = skipping.client
+    client.gate.clear()
+    batch = asyncio.create_task(skipping.async_set_output_sources(2, [1]))
+    await asyncio.sleep(0)
+    route = asyncio.create_task(skipping.async_set_output_source(1, 1))
+    await asyncio.sleep(0)
+    client.gate.set()
+    await asyncio.gather(batch, route)
+
+    assert client.sent == [["s in 2 av out 1!"], ["s in 1 av out 1!"]]
+    assert skipping.data.outputs[1] == 1
+
+
+async def test_writes_are_not_skipped_after_a_failed_poll(skipping):
+    skipping.client.get_state.side_effect = ConnectionError
+    await skipping.async_refresh()
+
+    await skipping.async_set_power(True)
+
+    assert skipping.client.sent == [["s power 1!"]]
@@ -0,0 +1,60 @@
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from custom_components.orei_matrix.const import SIGNAL_POWER_UPDATED
+from custom_components.orei_matrix.entity import OreiMatrixEntity
+from custom_components.orei_matrix.models import MatrixSnapshot, RoutingSnapshot
+
+
+class _Entity(OreiMatrixEntity):
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self.updates = 0
+        self.async_write_ha_state = MagicMock()
+
+    def _handle_coordinator_update(self):
+        self.updates += 1
+        super()._handle_coordinator_update()
+
+
+async def _added_entity(hass) -> _Entity:
+    coordinator = DataUpdateCoordinator(
+        hass, MagicMock(), name="test", update_interval=timedelta(seconds=30)
+    )
+    coordinator.config_entry = MagicMock(entry_id="entry")
+    coordinator.data = MatrixSnapshot(True, RoutingSnapshot(), "UHD")
+    entity = _Entity(coordinator)
+    entity.hass = hass
+    await entity.async_added_to_hass()
+    return entity
+
+
+async def test_coordinator_update_without_signal_is_ignored(hass):
+    entity = await _added_entity(hass)
+
+    entity.coordinator.async_set_updated_data(
+        entity.coordinator.data._replace(power=False)
+    )
+    await hass.async_block_till_done()
+
+    assert entity.updates == 0
+    entity.async_write_ha_state.assert_not_called()
+
+
+async def test_signal_writes_state_only_when_fingerprint_changes(hass):
+    entity = await _added_entity(hass)
+    signal = SIGNAL_POWER_UPDATED.format("entry")
+
+    async_dispatcher_send(hass, signal)
+    await hass.async_block_till_done()
+    entity.async_write_ha_state.assert_not_called()
+
+    entity.coordinator.data = entity.coordinator.data._replace(power=False)
+    async_dispatcher_send(hass, signal)
+    await hass.async_block_till_done()
+
+    assert entity.updates == 2
+    entity.async_write_ha_state.assert_called_once()
@@ -0,0 +1,78 @@
+import logging
+
+from custom_components.orei_matrix.models import (
+    LinkSnapshot,
+    LinkState,
+    MatrixSnapshot,
+    RoutingSnapshot,
+)
+
+
+def _snapshot() -> MatrixSnapshot:
+    return MatrixSnapshot(True, RoutingSnapshot.from_mapping({1: 2, 2: 1}), "UHD")
+
+
+def test_link_state_parses_known_states():
+    assert LinkState.parse(" Sync ") is LinkState.SYNC
+    assert LinkState.parse("connect") is LinkState.CONNECT
+    assert LinkState.parse("disconnect") is LinkState.DISCONNECT
+    assert str(LinkState.SYNC) == "sync"
+
+
+def test_unknown_link_state_is_kept_apart_and_logged_once(caplog):
+    caplog.set_level(logging.DEBUG, logger="custom_components.orei_matrix.models")
+
+    assert LinkState.parse("hdcp") is LinkState.UNKNOWN
+    assert LinkState.parse("HDCP") is LinkState.UNKNOWN
+    assert str(LinkState.UNKNOWN) == "unknown"
+    assert caplog.text.count("Unknown link state") == 1
+
+
+def test_link_snapshot_keeps_unknown_states():
+    links = LinkSnapshot.from_mapping({1: "sync", 2: "hdcp"})
+
+    assert dict(links) == {1: LinkState.SYNC, 2: LinkState.UNKNOWN}
+
+
+def test_merge_without_changes_returns_the_same_snapshot():
+    routing = RoutingSnapshot.from_mapping({1: 2, 2: 1})
+
+    assert routing.merge({1: 2, 3: None}) is routing
+    assert routing.merge({}) is routing
+
+
+def test_merge_returns_a_new_snapshot_with_the_changes():
+    routing = RoutingSnapshot.from_mapping({1: 2, 2: 1})
+    merged = routing.merge({2: 3, 4: 1})
+
+    assert dict(merged) == {1: 2, 2: 3, 4: 1}
+    assert dict(routing) == {1: 2, 2: 1}
+    assert merged.changed_ports(routing) == [2, 4]
+
+
+def test_evolve_without_changes_returns_the_same_snapshot():
+    snapshot = _snapshot()
+
+    assert snapshot.evolve() is snapshot
+    assert (
+        snapshot.evolve(power=True, outputs=RoutingSnapshot.from_mapping({1: 2, 2: 1}))
+        is snapshot
+    )
+
+
+def test_evolve_shares_the_fields_that_did_not_change():
+    snapshot = _snapshot()
+    evolved = snapshot.evolve(
+        power=False, outputs=RoutingSnapshot.from_mapping({1: 2, 2: 1})
+    )
+
+    assert evolved is not snapshot
+    assert evolved.power is False
+    assert evolved.outputs is snapshot.outputs
+
+
+def test_merge_drops_out_of_range_ports_and_values():
+    routing = RoutingSnapshot.from_mapping({1: 2})
+
+    assert routing.merge({1: 300, 0: 1, 300: 1, 10**9: 1, 2: 0}) is routing
+    assert dict(RoutingSnapshot.from_mapping({1: 300, 2: 3})) == {2: 3}
@@ -0,0 +1,66 @@
+import pytest
+
+from custom_components.orei_matrix.parser import (
+    Banner,
+    InputLinkEvent,
+    OutputLinkEvent,
+    PowerEvent,
+    RouteEvent,
+    parse_banner,
+    parse_events,
+    parse_line,
+)
+
+
+@pytest.mark.parametrize(
+    ("line", "event"),
+    [
+        ("input 3 -> output 1", RouteEvent(3, 1)),
+        ("Input3->Output12", RouteEvent(3, 12)),
+        ("in 2 -> out 4", RouteEvent(2, 4)),
+        ("power on", PowerEvent(True)),
+        ("Power: OFF", PowerEvent(False)),
+        ("hdmi input 2: sync", InputLinkEvent(2, "sync")),
+        ("HDMI Input 5 : Connect", InputLinkEvent(5, "connect")),
+        ("hdmi output 1: disconnect", OutputLinkEvent(1, "disconnect")),
+        ("hdbt output 3: connect", OutputLinkEvent(3, "connect")),
+    ],
+)
+def test_parse_line_shapes(line, event):
+    assert parse_line(line) == event
+
+
+@pytest.mark.parametrize(
+    "line",
+    ["", "UHD48-EX230-K", "powered on", "output 3", "main input 1"],
+)
+def test_parse_line_ignores_other_lines(line):
+    assert parse_line(line) is None
+
+
+def test_parse_events_keeps_order_and_skips_noise():
+    lines = ["power on", "noise", "input 1 -> output 2", "hdmi input 1: sync"]
+
+    assert parse_events(lines) == [
+        PowerEvent(True),
+        RouteEvent(1, 2),
+        InputLinkEvent(1, "sync"),
+    ]
+
+
+def test_parse_banner_finds_firmware_version_and_model():
+    lines = ["***", "Welcome to UHD48-EX230-K", "FW Version: 1.3.2", "***"]
+
+    assert parse_banner(lines) == Banner("1.3.2", "UHD48-EX230-K")
+
+
+@pytest.mark.parametrize(
+    ("lines", "banner"),
+    [
+        ([], Banner(None, None)),
+        (["FW Version 1.3.2"], Banner("1.3.2", None)),
+        (["welcome to UHD48"], Banner(None, "UHD48")),
+    ],
+)
+def test_parse_banner_leaves_missing_parts_out(lines, banner):
+    assert parse_banner(lines) == banner
@@ -0,0 +1,146 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.orei_matrix.coordinator import OreiMatrixClient
+
+
+@pytest.fixture
+def client():
+    """Return a client whose queue runs against a recorded fake connection."""
+    client = OreiMatrixClient("matrix", coalesce_window=0.05)
+    client.sent = []
+    # Cleared by a test to hold the command on the wire until it is set
+    client.gate = asyncio.Event()
+    client.gate.set()
+
+    async def execute(cmds):
+        client.sent.append(list(cmds))
+        await client.gate.wait()
+        return [[cmd] for cmd in cmds]
+
+    client._ensure_connected = AsyncMock()
+    client._execute = execute
+    return client
+
+
+async def test_rapid_routes_to_one_output_send_only_the_last(client):
+    results = await asyncio.gather(
+        client.set_output_source(1, 4),
+        client.set_output_source(2, 4),
+        client.set_output_source(3, 4),
+    )
+
+    assert client.sent == [["s in 3 av out 4!"]]
+    assert results == [False, False, True]
+    await client.close()
+
+
+async def test_routes_to_different_outputs_are_all_sent(client):
+    results = await asyncio.gather(
+        client.set_output_source(1, 1), client.set_output_source(2, 2)
+    )
+
+    assert sorted(client.sent) == [["s in 1 av out 1!"], ["s in 2 av out 2!"]]
+    assert results == [True, True]
+    await client.close()
+
+
+async def test_superseded_power_change_reports_not_sent(client):
+    assert await asyncio.gather(client.set_power(False), client.set_power(True)) == [
+        False,
+        True,
+    ]
+    assert client.sent == [["s power 1!"]]
+    await client.close()
+
+
+async def test_write_goes_before_polls_queued_ahead_of_it(client):
+    client.gate.clear()
+    running = asyncio.create_task(client.batch(["r power!"]))
+    await asyncio.sleep(0)
+    queued_poll = asyncio.create_task(client.batch(["r status!"]))
+    write = asyncio.create_task(client.batch(["s power 1!"]))
+    await asyncio.sleep(0)
+    client.gate.set()
+    await asyncio.gather(running, queued_poll, write)
+
+    assert client.sent == [["r power!"], ["s power 1!"], ["r status!"]]
+    await client.close()
+
+
+async def test_identical_queued_reads_share_one_execution(client):
+    client.gate.clear()
+    running = asyncio.create_task(client.batch(["r power!"]))
+    await asyncio.sleep(0)
+    first = asyncio.create_task(client.batch(["r status!"]))
+    second = asyncio.create_task(client.batch(["r status!"]))
+    await asyncio.sleep(0)
+    client.gate.set()
+    await running
+
+    assert await first == await second == [["r status!"]]
+    assert client.sent == [["r power!"], ["r status!"]]
+    await client.close()
+
+
+async def test_read_joins_the_same_read_on_the_wire(client):
+    client.gate.clear()
+    first = asyncio.create_task(client.batch(["r status!"]))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(client.batch(["r status!"]))
+    await asyncio.sleep(0)
+    client.gate.set()
+
+    assert await first == await second == [["r status!"]]
+    assert client.sent == [["r status!"]]
+    await client.close()
+
+
+async def test_read_behind_a_write_does_not_join_the_read_on_the_wire(client):
+    client.gate.clear()
+    first = asyncio.create_task(client.batch(["r status!"]))
+    await asyncio.sleep(0)
+    write = asyncio.create_task(client.batch(["s power 1!"]))
+    second = asyncio.create_task(client.batch(["r status!"]))
+    await asyncio.sleep(0)
+    client.gate.set()
+    await asyncio.gather(first, write, second)
+
+    assert client.sent == [["r status!"], ["s power 1!"], ["r status!"]]
+    await client.close()
+
+
+async def test_batch_route_does_not_overtake_a_held_route(client):
+    held = asyncio.create_task(client.set_output_source(3, 1))
+    await asyncio.sleep(0.01)
+    await client.set_output_sources(2, [1, 2])
+
+    assert await held
+    assert client.sent == [
+        ["s in 3 av out 1!"],
+        ["s in 2 av out 1!", "s in 2 av out 2!"],
+    ]
+    await client.close()
+
+
+async def test_cec_write_does_not_overtake_a_held_route(client):
+    held = asyncio.create_task(client.set_output_source(3, 1))
+    await asyncio.sleep(0.01)
+    await client.set_output_active(1)
+
+    assert await held
+    assert client.sent[0] == ["s in 3 av out 1!"]
+    await client.close()
+
+
+async def test_write_to_another_output_keeps_the_route_held(client):
+    held = asyncio.create_task(client.set_output_source(3, 1))
+    await asyncio.sleep(0.01)
+    await client.set_output_sources(2, [2])
+    await client.set_output_source(4, 1)
+
+    assert await held is False
+    assert client.sent == [["s in 2 av out 2!"], ["s in 4 av out 1!"]]
+    await client.close()
@@ -0,0 +1,129 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.orei_matrix.transport import (
+    DO,
+    DONT,
+    IAC,
+    PROMPT,
+    SB,
+    SE,
+    WILL,
+    WONT,
+    MatrixProtocol,
+)
+
+# Telnet option and command bytes the matrix may send
+ECHO = 1
+SGA = 3
+TTYPE = 24
+NOP = 241
+
+
+@pytest.fixture
+def protocol():
+    """Return a connected protocol that records what it hands on and sends."""
+    received: list[str] = []
+    protocol = MatrixProtocol(received.extend, MagicMock())
+    protocol.received = received
+    protocol.transport = MagicMock()
+    protocol.connection_made(protocol.transport)
+    return protocol
+
+
+def _feed(protocol, *chunks: bytes):
+    for chunk in chunks:
+        protocol.data_received(chunk)
+
+
+def test_lines_are_stripped_and_blank_lines_dropped(protocol):
+    _feed(protocol, b"r power!\r\n power on \r\n\r\n")
+
+    assert protocol.received == ["r power!", "power on"]
+
+
+def test_line_split_across_chunks_is_handed_on_once_complete(protocol):
+    _feed(protocol, b"input 1 -", b"> output 2")
+    assert protocol.received == []
+
+    _feed(protocol, b"\r\n")
+    assert protocol.received == ["input 1 -> output 2"]
+
+
+def test_prompt_is_handed_on_without_waiting_for_a_newline(protocol):
+    _feed(protocol, b"power on\r\n\r\n>")
+
+    assert protocol.received == ["power on", PROMPT]
+
+
+def test_prompt_before_the_next_echo_is_split_off(protocol):
+    _feed(protocol, b"power on\r\n\r\n>", b"r av out 0!\r\n")
+
+    assert protocol.received == ["power on", PROMPT, "r av out 0!"]
+
+
+def test_prompts_on_one_line_are_each_handed_on(protocol):
+    _feed(protocol, b">>r type!\r\n")
+
+    assert protocol.received == [PROMPT, PROMPT, "r type!"]
+
+
+def test_connection_lost_is_passed_on(protocol):
+    error = OSError("reset")
+    protocol.connection_lost(error)
+
+    protocol._on_lost.assert_called_once_with(error)
+
+
+def _sent(protocol) -> bytes:
+    return b"".join(call.args[0] for call in protocol.transport.write.call_args_list)
+
+
+def test_telnet_commands_are_stripped_across_chunks(protocol):
+    data = bytes([IAC, WILL, ECHO]) + b"power on\r\n" + bytes([IAC, NOP]) + b">"
+    # Byte at a time, so every command is split between chunks
+    _feed(protocol, *(data[i : i + 1] for i in range(len(data))))
+
+    assert protocol.received == ["power on", PROMPT]
+
+
+def test_subnegotiation_is_skipped(protocol):
+    _feed(
+        protocol,
+        bytes([IAC, SB, TTYPE, 1, IAC, IAC, 7, IAC, SE]) + b"power on\r\n",
+    )
+
+    assert protocol.received == ["power on"]
+
+
+def test_echo_and_go_ahead_are_accepted_and_others_refused(protocol):
+    _feed(
+        protocol,
+        bytes([IAC, WILL, ECHO, IAC, WILL, SGA, IAC, DO, SGA, IAC, DO, TTYPE]),
+        bytes([IAC, WILL, TTYPE]),
+    )
+
+    assert _sent(protocol) == bytes(
+        [IAC, DO, ECHO, IAC, DO, SGA, IAC, WILL, SGA, IAC, WONT, TTYPE]
+    ) + bytes([IAC, DONT, TTYPE])
+
+
+def test_repeated_requests_for_an_accepted_option_are_not_answered(protocol):
+    _feed(protocol, bytes([IAC, WILL, ECHO, IAC, DO, SGA]))
+    _feed(protocol, bytes([IAC, WILL, ECHO, IAC, DO, SGA, IAC, DONT, TTYPE]))
+
+    assert _sent(protocol) == bytes([IAC, DO, ECHO, IAC, WILL, SGA])
+
+
+def test_repeated_requests_for_a_refused_option_are_refused_again(protocol):
+    _feed(protocol, bytes([IAC, WILL, TTYPE, IAC, DO, TTYPE]))
+    _feed(protocol, bytes([IAC, WILL, TTYPE, IAC, DO, TTYPE]))
+
+    assert _sent(protocol) == 2 * bytes([IAC, DONT, TTYPE, IAC, WONT, TTYPE])
+
+
+def test_option_turned_off_is_acknowledged(protocol):
+    _feed(protocol, bytes([IAC, WILL, ECHO]), bytes([IAC, WONT, ECHO]))
+
+    assert _sent(protocol) == bytes([IAC, DO, ECHO, IAC, DONT, ECHO])